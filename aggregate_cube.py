@@ -0,0 +1,262 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from data_processing import (
+    measure_labels, data_watermark, has_local_source, load_aggregates, load_table_columns, load_data, as_list,
+)
+from prepared_data import get_prepared_version
+from column_metadata import check_group_totals, measure_pairs
+from spans import span, PREPROCESSAMENTO
+
+# Dimensões de filtro, da mais geral para a mais detalhada
+DIMENSIONS = ['uf_nome', 'nome_municipio', 'ano_aih', 'mes_aih']
+
+# Níveis materializados da hierarquia (prefixos de DIMENSIONS)
+LEVELS = [tuple(DIMENSIONS[:i]) for i in range(len(DIMENSIONS) + 1)]
+
+# Atributos fixos de cada município, guardados junto com o cubo
+MUNICIPALITY_ATTRIBUTES = ['latitude', 'longitude', 'faixa_populacao']
+
+# Função para construir o cubo de agregados: para cada nível da hierarquia,
+# somas de todas as medidas qtd_*/vl_* e a contagem de linhas de origem.
+# Médias são obtidas como soma / contagem, sem voltar aos dados linha a linha.
+def build_cube(df):
+    measures = [col for col in measure_labels() if col in df.columns]
+    # Acumular em float64 para não perder precisão com as colunas float32;
+    # linhas sem estado/município continuam contando nos totais gerais
+    base = df[DIMENSIONS + measures].astype({col: 'float64' for col in measures})
+    base['n_linhas'] = 1
+
+    levels = {}
+    finest = base.groupby(DIMENSIONS, observed=True, sort=True, dropna=False).sum()
+    levels[tuple(DIMENSIONS)] = finest
+    for level in LEVELS[:-1]:
+        if level:
+            levels[level] = finest.groupby(level=list(level), observed=True, sort=True, dropna=False).sum()
+        else:
+            levels[level] = finest.sum().to_frame().T
+
+    # Cada nível também como bloco 2-D contíguo (células × medidas + n_linhas)
+    # para as reduções vetorizadas de cube_totals
+    blocks = {level: np.ascontiguousarray(cells.to_numpy(np.float64)) for level, cells in levels.items()}
+
+    attributes = [col for col in MUNICIPALITY_ATTRIBUTES if col in df.columns]
+    municipios = df.groupby(['uf_nome', 'nome_municipio'], observed=True)[attributes].first()
+
+    # Conferência dos totais de grupo armazenados contra a soma dos subgrupos,
+    # por célula do nível mais detalhado
+    consistencia = check_group_totals(finest)
+
+    return {
+        'measures': measures, 'levels': levels, 'blocks': blocks,
+        'municipios': municipios, 'consistencia': consistencia,
+        'derivadas': build_derived(levels, municipios, measures),
+    }
+
+# Função para dividir blocos elemento a elemento (NaN onde o divisor é zero)
+def _ratio(numerador, denominador):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(denominador > 0, numerador / denominador, np.nan)
+
+# Função para calcular as medidas derivadas a partir dos níveis do cubo, em
+# blocos, para todos os pares qtd_*/vl_* de uma vez:
+#   - por_faixa: média por município de cada medida, por faixa populacional e ano;
+#   - custo_unitario_faixa: vl / qtd por faixa populacional e ano.
+# O custo por procedimento de um recorte qualquer vem de unit_costs, como razão
+# das somas do recorte.
+def build_derived(levels, municipios, measures):
+    pares = measure_pairs()
+    pares = pares[pares['quantidade'].isin(measures) & pares['valor'].isin(measures)]
+    quantidades, valores = pares['quantidade'].tolist(), pares['valor'].tolist()
+
+    celulas = levels[('uf_nome', 'nome_municipio', 'ano_aih')]
+    derivadas = {'por_faixa': None, 'custo_unitario_faixa': None}
+
+    if 'faixa_populacao' in municipios.columns:
+        faixa = municipios['faixa_populacao'].reindex(celulas.index.droplevel('ano_aih')).to_numpy()
+        grupos = celulas.groupby([faixa, celulas.index.get_level_values('ano_aih')], sort=True)
+        somas = grupos[measures].sum()
+        somas.index.names = ['faixa_populacao', 'ano_aih']
+        n_municipios = grupos.size().to_numpy()
+        por_faixa = somas.div(n_municipios, axis=0)
+        por_faixa['n_municipios'] = n_municipios
+        derivadas['por_faixa'] = por_faixa
+        derivadas['custo_unitario_faixa'] = pd.DataFrame(
+            _ratio(somas[valores].to_numpy(), somas[quantidades].to_numpy()),
+            index=somas.index, columns=valores,
+        )
+    return derivadas
+
+# Função para obter o cubo do conjunto preparado (construído uma vez para cada
+# versão dos dados)
+def get_cube():
+    return _cube(data_watermark())
+
+@st.cache_resource(show_spinner="Calculando agregados...", max_entries=1)
+def _cube(watermark):
+    df = get_prepared_version(watermark)
+    with span(PREPROCESSAMENTO, 'build_cube'):
+        return build_cube(df)
+
+# Função para normalizar os filtros de uma consulta em {dimensão: valores}
+def _filters(uf=None, municipio=None, anos=None):
+    return {
+        'uf_nome': as_list(uf),
+        'nome_municipio': as_list(municipio),
+        'ano_aih': None if as_list(anos) is None else [int(ano) for ano in as_list(anos)],
+    }
+
+# Função para escolher o menor nível que contém as dimensões necessárias
+def _level_for(needed):
+    return next(level for level in LEVELS if set(needed) <= set(level))
+
+# Função para listar as medidas disponíveis: as do cubo ou, sem tabela local,
+# as colunas da tabela no banco
+def available_measures():
+    if has_local_source():
+        return get_cube()['measures']
+    colunas = set(load_table_columns())
+    return [label for label in measure_labels() if label in colunas]
+
+# Função para consultar o cubo com os mesmos parâmetros de load_aggregates.
+# Sem tabela local, a consulta é feita no próprio banco por load_aggregates,
+# sem trazer a tabela inteira para montar o cubo.
+# Escolhe o menor nível que contém as dimensões filtradas e agrupadas, de modo
+# que cada consulta percorre apenas algumas centenas de células.
+def cube_query(measures=None, by=None, agg='sum', uf=None, municipio=None, anos=None, cube=None):
+    if cube is None and not has_local_source():
+        measures = available_measures() if measures is None else list(measures)
+        return load_aggregates(measures, by, agg, uf, municipio, anos)
+    cube = get_cube() if cube is None else cube
+    measures = cube['measures'] if measures is None else list(measures)
+    by = list(by or [])
+    filters = _filters(uf, municipio, anos)
+    needed = set(by) | {dim for dim, values in filters.items() if values is not None}
+    level = _level_for(needed)
+    cells = cube['levels'][level]
+
+    if level:
+        mask = np.ones(len(cells), dtype=bool)
+        for dim, values in filters.items():
+            if values is not None:
+                mask &= cells.index.get_level_values(dim).isin(values)
+        cells = cells[mask]
+
+    columns = measures + ['n_linhas']
+    if by:
+        result = cells.groupby(level=by, observed=True, sort=True, dropna=False)[columns].sum()
+    else:
+        result = cells[columns].sum().to_frame().T
+
+    if agg == 'mean':
+        n = result['n_linhas'].replace(0, np.nan)
+        result[measures] = result[measures].div(n, axis=0)
+    elif agg != 'sum':
+        raise ValueError(f"Agregação não suportada: {agg}")
+
+    return result.reset_index() if by else result.reset_index(drop=True)
+
+# Função para somar blocos de medidas para várias combinações de filtros em
+# uma única chamada. `filtros` é uma lista de dicts com as chaves uf, municipio
+# e anos; cada combinação vira uma linha de uma matriz de seleção
+# (combinações × células), e os totais saem de um único produto matricial
+# com o bloco do nível. Retorna um DataFrame com uma linha por combinação.
+# Sem tabela local, cada combinação vira uma consulta de soma no banco.
+def cube_totals(measures=None, filtros=({},), cube=None):
+    if cube is None and not has_local_source():
+        measures = available_measures() if measures is None else list(measures)
+        linhas = [load_aggregates(measures, agg='sum', **filtro) for filtro in filtros]
+        return pd.concat(linhas, ignore_index=True)[measures + ['n_linhas']]
+    cube = get_cube() if cube is None else cube
+    measures = cube['measures'] if measures is None else list(measures)
+    filtros = [_filters(**filtro) for filtro in filtros]
+    needed = {dim for filtro in filtros for dim, values in filtro.items() if values is not None}
+    level = _level_for(needed)
+    cells = cube['levels'][level]
+    block = cube['blocks'][level]
+
+    columns = measures + ['n_linhas']
+    posicoes = cells.columns.get_indexer(columns)
+    selecao = np.ones((len(filtros), len(cells)), dtype=bool)
+    for i, filtro in enumerate(filtros):
+        for dim, values in filtro.items():
+            if values is not None:
+                selecao[i] &= cells.index.get_level_values(dim).isin(values)
+
+    totais = selecao.astype(np.float64) @ block[:, posicoes]
+    return pd.DataFrame(totais, columns=columns)
+
+# Função para obter as n maiores entradas de uma série de totais, em ordem
+# decrescente, sem ordenar a série inteira (argpartition + ordenação de n)
+def top_n(totais, n=10):
+    valores = totais.to_numpy()
+    if n < len(valores):
+        maiores = np.argpartition(-valores, n - 1)[:n]
+    else:
+        maiores = np.arange(len(valores))
+    maiores = maiores[np.argsort(-valores[maiores], kind='stable')]
+    return totais.iloc[maiores]
+
+# Função para obter o custo por procedimento (vl / qtd) de cada par de medidas
+# no recorte filtrado, como razão das somas do cubo
+def unit_costs(uf=None, municipio=None, anos=None, cube=None):
+    medidas = set(available_measures() if cube is None else cube['measures'])
+    pares = measure_pairs()
+    pares = pares[pares['quantidade'].isin(medidas) & pares['valor'].isin(medidas)]
+    quantidades, valores = pares['quantidade'].tolist(), pares['valor'].tolist()
+    somas = cube_totals(quantidades + valores, [{'uf': uf, 'municipio': municipio, 'anos': anos}], cube).iloc[0]
+    return pd.Series(_ratio(somas[valores].to_numpy(), somas[quantidades].to_numpy()), index=valores)
+
+# Função para obter as medidas por faixa populacional e ano (médias por
+# município) e o custo por procedimento de cada faixa (None, None sem tabela
+# local)
+def population_band_measures(cube=None):
+    if cube is None and not has_local_source():
+        return None, None
+    cube = get_cube() if cube is None else cube
+    return cube['derivadas']['por_faixa'], cube['derivadas']['custo_unitario_faixa']
+
+# Função para montar a série mensal de todas as medidas no recorte filtrado:
+# somas e contagem de linhas por (ano, mês) em um único agrupamento sobre o
+# cubo, indexadas por um PeriodIndex mensal. O perfil sazonal (média por mês do
+# ano, somando todos os anos) é derivado da própria série.
+# Retorna {'serie': somas por período, 'sazonal': médias por mes_aih}.
+def temporal_store(uf=None, municipio=None, anos=None):
+    return _temporal_store(data_watermark(), uf, municipio, anos)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _temporal_store(watermark, uf, municipio, anos):
+    cube = _cube(watermark) if has_local_source() else None
+    somas = cube_query(by=['ano_aih', 'mes_aih'], agg='sum', uf=uf, municipio=municipio, anos=anos, cube=cube)
+    # prepare_data grava mês ausente como 0; essas linhas não têm período e
+    # ficam fora da série e do perfil sazonal
+    somas = somas.dropna(subset=['ano_aih', 'mes_aih'])
+    somas = somas[somas['mes_aih'].between(1, 12) & (somas['ano_aih'] > 0)]
+    datas = pd.to_datetime({'year': somas['ano_aih'].astype(int), 'month': somas['mes_aih'].astype(int), 'day': 1})
+    periodos = pd.PeriodIndex(datas.dt.to_period('M'))
+    serie = somas.drop(columns=['ano_aih', 'mes_aih']).set_axis(periodos).sort_index()
+    serie.index.name = 'periodo'
+
+    por_mes = serie.groupby(serie.index.month).sum()
+    n = por_mes['n_linhas'].replace(0, np.nan)
+    medidas = [col for col in serie.columns if col != 'n_linhas']
+    sazonal = por_mes[medidas].div(n, axis=0)
+    sazonal['n_linhas'] = por_mes['n_linhas']
+    sazonal.index.name = 'mes_aih'
+    return {'serie': serie, 'sazonal': sazonal.reset_index()}
+
+# Função para obter latitude, longitude e faixa populacional dos municípios.
+# Sem tabela local, busca só essas colunas no banco.
+def municipality_attributes(cube=None):
+    if cube is None and not has_local_source():
+        df = load_data(columns=['uf_nome', 'nome_municipio'] + MUNICIPALITY_ATTRIBUTES)
+        return df.groupby(['uf_nome', 'nome_municipio'], observed=True).first()
+    cube = get_cube() if cube is None else cube
+    return cube['municipios']
+
+# Função para obter a conferência dos totais de grupo (None sem tabela local)
+def group_consistency(cube=None):
+    if cube is None and not has_local_source():
+        return None
+    cube = get_cube() if cube is None else cube
+    return cube['consistencia']
@@ -0,0 +1,158 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import pyarrow as pa
+from snapshot import read_snapshot, write_snapshot
+from series_models import VALOR_TOTAL, QUANTIDADE_TOTAL, ANOS_PREVISAO, annual_totals, split_train_test, forecast_series
+from ml_models import (
+    KMEANS_COLUMNS, cluster_kmeans, train_random_forest,
+    find_target_column, encode_features, train_gradient_boosting,
+)
+
+# ---------------------------------------------
+# Relatório em lote: todas as análises para todos os municípios
+# ---------------------------------------------
+# Os dados são carregados e preparados uma única vez e gravados em um arquivo
+# Arrow ordenado por (uf_nome, nome_municipio). Cada processo do pool abre o
+# arquivo mapeado em memória e converte só o trecho do seu município.
+# Uso: python batch_report.py --saida relatorio --formato parquet
+
+DIMENSOES = ['uf_nome', 'nome_municipio']
+
+# Tabela compartilhada, aberta uma vez em cada processo do pool
+_tabela = None
+
+# Função para carregar, preparar e ordenar os dados; retorna a tabela Arrow e
+# os trechos (início, tamanho) de cada município
+def load_prepared_table():
+    # Importados aqui para que os processos do pool não carreguem a camada de dados
+    from data_processing import load_data
+    from prepared_data import prepare_data
+
+    # Carga única da tabela inteira: sem o cache de resultados de load_data
+    df = prepare_data(load_data.__wrapped__())
+    df = df.sort_values(DIMENSOES + ['ano_aih', 'mes_aih'], kind='stable').reset_index(drop=True)
+    trechos = [
+        (uf, municipio, int(posicoes[0]), len(posicoes))
+        for (uf, municipio), posicoes in df.groupby(DIMENSOES, observed=True, sort=False).indices.items()
+    ]
+    return pa.Table.from_pandas(df, preserve_index=False), trechos
+
+# Função executada ao iniciar cada processo do pool
+def _init_worker(path):
+    global _tabela
+    # Avisos de convergência do statsmodels/sklearn não interessam no lote
+    warnings.filterwarnings('ignore')
+    _tabela = read_snapshot(path)
+
+# Função para executar as análises de um município (executada no pool)
+def analyze_municipality(uf, municipio, inicio, tamanho, n_estimators=100, learning_rate=0.1):
+    df = _tabela.slice(inicio, tamanho).to_pandas()
+    chave = {'uf_nome': uf, 'nome_municipio': municipio}
+    metricas, previsoes, erros = [], [], []
+
+    # Séries anuais: ARIMA e SARIMA para custos e quantidades
+    train, test = split_train_test(annual_totals(df))
+    for modelo in ('ARIMA', 'SARIMA'):
+        for medida in (VALOR_TOTAL, QUANTIDADE_TOTAL):
+            try:
+                resultado = forecast_series(train[medida], modelo, steps=len(test))
+            except Exception as e:
+                erros.append({**chave, 'analise': modelo, 'erro': f"{medida}: {e}"})
+                continue
+            for metrica in ('mae', 'rmse', 'mape', 'acuracia'):
+                metricas.append({**chave, 'analise': modelo, 'medida': medida,
+                                 'metrica': metrica, 'valor': float(resultado[metrica])})
+            for ano, previsao in zip(ANOS_PREVISAO, resultado['previsao']):
+                previsoes.append({**chave, 'modelo': modelo, 'medida': medida,
+                                  'ano': ano, 'previsao': float(previsao)})
+
+    # Random Forest e Gradient Boosting sobre as linhas mensais do município
+    regressores = {
+        'RandomForest': lambda: train_random_forest(df, n_estimators),
+        'GradientBoosting': lambda: train_gradient_boosting(
+            encode_features(df), find_target_column(df), n_estimators, learning_rate
+        ),
+    }
+    for analise, treinar in regressores.items():
+        try:
+            resultado = treinar()
+        except Exception as e:
+            erros.append({**chave, 'analise': analise, 'erro': str(e)})
+            continue
+        for metrica, valor in resultado['metricas'].items():
+            metricas.append({**chave, 'analise': analise, 'medida': None,
+                             'metrica': metrica, 'valor': float(valor)})
+
+    return metricas, previsoes, erros
+
+# Função para agrupar todas as linhas com K-Means (executada no pool)
+def cluster_all(n_clusters):
+    df = _tabela.select(DIMENSOES + ['ano_aih', 'mes_aih'] + KMEANS_COLUMNS).to_pandas()
+    df['Cluster'], resultado = cluster_kmeans(df[KMEANS_COLUMNS], n_clusters)
+    metricas = [
+        {'uf_nome': None, 'nome_municipio': None, 'analise': 'KMeans', 'medida': None,
+         'metrica': metrica, 'valor': float(valor)}
+        for metrica, valor in resultado.items()
+    ]
+    return df[DIMENSOES + ['ano_aih', 'mes_aih', 'Cluster']], metricas
+
+# Função para gravar uma tabela de resultados em Parquet ou CSV
+def write_output(df, pasta, nome, formato):
+    path = os.path.join(pasta, f"{nome}.{formato}")
+    if formato == 'parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera métricas e previsões de todos os municípios.")
+    parser.add_argument('--saida', default='relatorio', help="Pasta de saída")
+    parser.add_argument('--formato', choices=['parquet', 'csv'], default='parquet')
+    parser.add_argument('--processos', type=int, default=os.cpu_count())
+    parser.add_argument('--n-clusters', type=int, default=3)
+    parser.add_argument('--n-estimators', type=int, default=100)
+    parser.add_argument('--learning-rate', type=float, default=0.1)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    tabela, trechos = load_prepared_table()
+    print(f"{tabela.num_rows} linhas, {len(trechos)} municípios carregados", file=sys.stderr)
+
+    os.makedirs(args.saida, exist_ok=True)
+    metricas, previsoes, erros = [], [], []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'dados.arrow')
+        write_snapshot(tabela, path)
+        del tabela
+
+        with ProcessPoolExecutor(max_workers=args.processos, initializer=_init_worker, initargs=(path,)) as pool:
+            clusters_futuro = pool.submit(cluster_all, args.n_clusters)
+            futuros = [
+                pool.submit(analyze_municipality, uf, municipio, pos, tam, args.n_estimators, args.learning_rate)
+                for uf, municipio, pos, tam in trechos
+            ]
+            for i, futuro in enumerate(futuros, 1):
+                m, p, e = futuro.result()
+                metricas.extend(m)
+                previsoes.extend(p)
+                erros.extend(e)
+                print(f"\r{i}/{len(futuros)} municípios", end='', file=sys.stderr)
+            print(file=sys.stderr)
+            clusters, metricas_kmeans = clusters_futuro.result()
+            metricas.extend(metricas_kmeans)
+
+    for nome, df in (
+        ('metricas', pd.DataFrame(metricas)),
+        ('previsoes', pd.DataFrame(previsoes)),
+        ('clusters', clusters),
+        ('erros', pd.DataFrame(erros, columns=['uf_nome', 'nome_municipio', 'analise', 'erro'])),
+    ):
+        print(f"Gravado {write_output(df, args.saida, nome, args.formato)}", file=sys.stderr)
+    print(f"Concluído em {time.perf_counter() - inicio:.1f} s", file=sys.stderr)
@@ -0,0 +1,186 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from page_registry import PAGES
+from spans import collect_spans, stage_totals, RENDERIZACAO
+
+# ---------------------------------------------
+# Benchmark das páginas, executadas sem navegador pelo AppTest do Streamlit
+# ---------------------------------------------
+# Cada página roda sobre um conjunto sintético fixo, com uma matriz de filtros
+# e valores de sliders. Para cada execução são registrados o tempo total, o
+# pico de memória do processo e o tempo de cada etapa (carga,
+# pré-processamento, ajuste de modelo e renderização).
+# Cada cenário roda em um processo próprio, para que o pico de memória medido
+# seja o do cenário e não o maior de todos os executados antes dele.
+# Uso: python benchmark.py --saida resultados.json
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'home.py')
+
+# Combinações de filtros aplicadas a todas as páginas
+FILTROS = [
+    {},
+    {'estado': 'Goiás'},
+    {'estado': 'Goiás', 'ano': '2020'},
+    {'estado': 'Distrito Federal', 'municipio': 'Brasília'},
+]
+
+# Valores de sliders testados por página (rótulo do slider -> valores)
+SLIDERS = {
+    'k_means': {"Número de Clusters": [3, 8]},
+    'gradient_boosting': {"Número de Estimadores (n_estimators):": [50, 200]},
+    'random_forest': {"Número de Árvores (n_estimators):": [50, 200]},
+}
+
+# Função para montar a matriz de cenários (filtros × sliders) de uma página
+def scenarios(page):
+    sliders = SLIDERS.get(page, {})
+    combinacoes = [dict(zip(sliders, valores)) for valores in itertools.product(*sliders.values())]
+    return [{'filtros': filtros, 'sliders': valores} for filtros in FILTROS for valores in combinacoes]
+
+# Função para obter o pico de memória residente do processo, em MB (desde o
+# início do processo; por isso cada cenário roda em um processo separado)
+def peak_rss_mb():
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB; macOS, em bytes
+    return round(pico / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+# Função para encontrar o selectbox de um filtro pelo rótulo
+def _filter_widget(at, chave):
+    for widget in at.selectbox:
+        rotulo = widget.label.lower()
+        if chave == 'estado' and 'estado' in rotulo:
+            return widget
+        if chave == 'municipio' and 'munic' in rotulo:
+            return widget
+        if chave == 'ano' and 'ano' in rotulo and 'estado' not in rotulo and 'munic' not in rotulo:
+            return widget
+    return None
+
+# Função para executar o script uma vez, medindo tempo, memória e etapas
+def timed_run(at, timeout):
+    collect_spans()
+    inicio = time.perf_counter()
+    at.run(timeout=timeout)
+    wall = time.perf_counter() - inicio
+    etapas = stage_totals(collect_spans())
+    # O que não foi medido por nenhum span (home, widgets) conta como renderização
+    etapas[RENDERIZACAO] = etapas.get(RENDERIZACAO, 0.0) + max(0.0, wall - sum(etapas.values()))
+    return {
+        'tempo_s': round(wall, 4),
+        'pico_rss_mb': peak_rss_mb(),
+        'etapas_s': {etapa: round(segundos, 4) for etapa, segundos in etapas.items()},
+        'erros': [str(erro.value) for erro in at.exception],
+    }
+
+# Função para executar um cenário: primeira execução da página com os valores
+# padrão, depois os filtros (um por vez, pois as opções dependem dos
+# anteriores) e por fim a execução medida com o cenário completo
+def run_scenario(page, cenario, timeout):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_FILE, default_timeout=timeout)
+    at.session_state['current_page'] = page
+    resultado = {'pagina': page, **cenario, 'inicial': timed_run(at, timeout)}
+
+    try:
+        chaves = [chave for chave in ('estado', 'municipio', 'ano') if chave in cenario['filtros']]
+        for posicao, chave in enumerate(chaves):
+            widget = _filter_widget(at, chave)
+            if widget is None:
+                raise LookupError(f"Filtro '{chave}' não encontrado")
+            widget.set_value(cenario['filtros'][chave])
+            if posicao < len(chaves) - 1:
+                at.run(timeout=timeout)
+        for rotulo, valor in cenario['sliders'].items():
+            widget = next((w for w in at.slider if w.label == rotulo), None)
+            if widget is None:
+                raise LookupError(f"Slider '{rotulo}' não encontrado")
+            widget.set_value(valor)
+    except (LookupError, ValueError) as e:
+        resultado['cenario'] = {'erros': [str(e)]}
+        return resultado
+
+    resultado['cenario'] = timed_run(at, timeout)
+    return resultado
+
+# Função para executar um cenário em um subprocesso e ler o resultado (JSON)
+def run_isolated(page, cenario, timeout):
+    processo = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--cenario', json.dumps({'pagina': page, **cenario}),
+         '--timeout', str(timeout)],
+        capture_output=True, text=True,
+    )
+    if processo.returncode != 0:
+        return {'pagina': page, **cenario, 'cenario': {'erros': [processo.stderr.strip()[-2000:]]}}
+    # O resultado é a última linha da saída padrão
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+# Função para obter o commit atual, para comparar resultados entre versões
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(APP_FILE),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede o tempo de execução das páginas do painel.")
+    parser.add_argument('--paginas', nargs='+', default=list(PAGES), choices=list(PAGES))
+    parser.add_argument('--municipios', type=int, default=50)
+    parser.add_argument('--anos', default='2019-2024')
+    parser.add_argument('--meses', type=int, default=12)
+    parser.add_argument('--timeout', type=float, default=600)
+    parser.add_argument('--saida', help="Arquivo JSON de saída (padrão: saída padrão)")
+    parser.add_argument('--cenario', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Execução de um único cenário no subprocesso criado por run_isolated
+    if args.cenario:
+        cenario = json.loads(args.cenario)
+        page = cenario.pop('pagina')
+        print(json.dumps(run_scenario(page, cenario, args.timeout), ensure_ascii=False))
+        sys.exit(0)
+
+    # Conjunto sintético fixo; definido antes de qualquer página importar
+    # data_processing
+    os.environ['TCC_DATA_SOURCE'] = 'synthetic'
+    os.environ['TCC_SYNTHETIC_MUNICIPIOS'] = str(args.municipios)
+    os.environ['TCC_SYNTHETIC_ANOS'] = args.anos
+    os.environ['TCC_SYNTHETIC_MESES'] = str(args.meses)
+
+    resultados = []
+    for page in args.paginas:
+        for cenario in scenarios(page):
+            resultado = run_isolated(page, cenario, args.timeout)
+            print(f"{page} {cenario}: {resultado['cenario'].get('tempo_s')} s", file=sys.stderr)
+            resultados.append(resultado)
+
+    relatorio = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'dados': {'origem': 'synthetic', 'municipios': args.municipios, 'anos': args.anos, 'meses': args.meses},
+        'resultados': resultados,
+    }
+    saida = json.dumps(relatorio, ensure_ascii=False, indent=2)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            f.write(saida)
+    else:
+        print(saida)
@@ -0,0 +1,115 @@
+import functools
+import re
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from data_processing import rename_mapping
+
+# ---------------------------------------------
+# Registro de metadados das colunas de medidas
+# ---------------------------------------------
+# Os códigos de rename_mapping seguem a tabela de procedimentos do SUS:
+# qtd_0201/vl_0201 é um subgrupo do grupo 02, vl_02 é o total do grupo e
+# qtd_total/vl_total o total geral. O registro guarda essa hierarquia para que
+# as páginas escolham colunas pelo código, e não pelo texto dos rótulos.
+
+# Código de medida: tipo (qtd/vl) seguido do grupo (2 dígitos), do subgrupo
+# (4 dígitos) ou de "total"
+_CODIGO = re.compile(r'^(qtd|vl)_(?:(\d{2})(\d{2})?|total)$')
+
+# Níveis da hierarquia, do mais detalhado para o total
+SUBGRUPO = 'subgrupo'
+GRUPO = 'grupo'
+TOTAL = 'total'
+
+# Função para montar o registro: uma linha por medida, com código, rótulo,
+# tipo, nível e grupo. As duplicatas em maiúsculas do mapeamento são ignoradas.
+@functools.lru_cache(maxsize=1)
+def column_registry():
+    linhas = []
+    for codigo, rotulo in rename_mapping.items():
+        encontrado = _CODIGO.match(codigo)
+        if encontrado is None:
+            continue
+        tipo, grupo, subgrupo = encontrado.groups()
+        if grupo is None:
+            nivel = TOTAL
+        elif subgrupo is None:
+            nivel = GRUPO
+        else:
+            nivel = SUBGRUPO
+        linhas.append({'codigo': codigo, 'rotulo': rotulo, 'tipo': tipo, 'nivel': nivel, 'grupo': grupo})
+    return pd.DataFrame(linhas).set_index('codigo')
+
+# Função para listar os rótulos das medidas de um tipo e, opcionalmente, de
+# um nível. Com `available`, mantém apenas as colunas presentes nele.
+def measure_columns(tipo, nivel=None, available=None):
+    registro = column_registry()
+    selecao = registro[registro['tipo'] == tipo]
+    if nivel is not None:
+        selecao = selecao[selecao['nivel'] == nivel]
+    rotulos = selecao['rotulo'].tolist()
+    if available is not None:
+        presentes = set(available)
+        rotulos = [rotulo for rotulo in rotulos if rotulo in presentes]
+    return rotulos
+
+# Função para listar os pares (quantidade, valor) com o mesmo código, como
+# qtd_0201/vl_0201 e qtd_total/vl_total. Retorna um DataFrame indexado pelo
+# código (sem o prefixo de tipo) com os rótulos das duas colunas.
+@functools.lru_cache(maxsize=1)
+def measure_pairs():
+    registro = column_registry()
+    codigos = registro.index.str.split('_', n=1).str[1]
+    pares = registro.assign(codigo=codigos).pivot(index='codigo', columns='tipo', values='rotulo').dropna()
+    ordem = [codigo for codigo in dict.fromkeys(codigos) if codigo in pares.index]
+    return pares.loc[ordem, ['qtd', 'vl']].rename(columns={'qtd': 'quantidade', 'vl': 'valor'})
+
+# Função para montar a matriz esparsa subgrupo -> grupo de um tipo de medida.
+# Retorna os rótulos dos subgrupos (linhas), os códigos dos grupos (colunas)
+# e a matriz CSR com 1 onde o subgrupo pertence ao grupo.
+@functools.lru_cache(maxsize=None)
+def group_matrix(tipo='vl'):
+    registro = column_registry()
+    folhas = registro[(registro['tipo'] == tipo) & (registro['nivel'] == SUBGRUPO)]
+    grupos = sorted(folhas['grupo'].unique())
+    coluna = {grupo: j for j, grupo in enumerate(grupos)}
+    matriz = sparse.csr_matrix(
+        (np.ones(len(folhas)), (np.arange(len(folhas)), folhas['grupo'].map(coluna).to_numpy())),
+        shape=(len(folhas), len(grupos)),
+    )
+    return folhas['rotulo'].tolist(), [f"{tipo}_{grupo}" for grupo in grupos], matriz
+
+# Função para calcular os totais de todos os grupos de uma vez: um único
+# produto da matriz esparsa pelo bloco de subgrupos (linhas × subgrupos).
+# Subgrupos ausentes em `df` contam como zero.
+def group_totals(df, tipo='vl'):
+    folhas, grupos, matriz = group_matrix(tipo)
+    bloco = df.reindex(columns=folhas, fill_value=0).to_numpy(np.float64)
+    totais = (matriz.T @ bloco.T).T
+    return pd.DataFrame(totais, index=df.index, columns=grupos)
+
+# Função para conferir os totais de grupo armazenados (vl_02 ... vl_08) contra
+# a soma dos subgrupos. Retorna, por grupo, os totais armazenado e calculado,
+# a maior diferença absoluta e o número de linhas fora da tolerância. A
+# tolerância é relativa, pois os valores são guardados em float32.
+def check_group_totals(df, tipo='vl', tolerancia=1e-4):
+    calculados = group_totals(df, tipo)
+    rotulos = column_registry()['rotulo']
+    resultado = []
+    for grupo in calculados.columns:
+        rotulo = rotulos.get(grupo)
+        if rotulo is None or rotulo not in df.columns:
+            continue
+        armazenado = df[rotulo].to_numpy(np.float64)
+        diferenca = np.abs(armazenado - calculados[grupo].to_numpy())
+        resultado.append({
+            'grupo': rotulo,
+            'total_armazenado': armazenado.sum(),
+            'total_calculado': calculados[grupo].sum(),
+            'diferenca_maxima': diferenca.max(initial=0.0),
+            'linhas_divergentes': int((diferenca > tolerancia * np.maximum(np.abs(armazenado), 1.0)).sum()),
+        })
+    return pd.DataFrame(resultado, columns=[
+        'grupo', 'total_armazenado', 'total_calculado', 'diferenca_maxima', 'linhas_divergentes'
+    ])
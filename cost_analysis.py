@@ -1,116 +1,140 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from data_processing import load_data
-from babel.numbers import format_currency
-
-# Função para formatar valores no padrão brasileiro
-def formatar_real(valor):
-    try:
-        return format_currency(valor, 'BRL', locale='pt_BR')
-    except:
-        return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-
-# ---------------------------------------------
-# Carregar os dados processados
-# ---------------------------------------------
-df = load_data()
-
-# Garantir que a coluna 'ano_aih' seja numérica e válida
-df['ano_aih'] = pd.to_numeric(df['ano_aih'], errors='coerce')
-df = df[df['ano_aih'].notna()]  # Remove valores NaN
-df['ano_aih'] = df['ano_aih'].astype(int)  # Converte para inteiro
-
-# ---------------------------------------------
-# Ajustar colunas e forçar tipos numéricos
-# ---------------------------------------------
-quantidade_cols = [col for col in df.columns if col.startswith("Quantidade")]
-valor_cols = [col for col in df.columns if col.startswith("Valor")]
-
-# Garantir que colunas de quantidades e valores sejam numéricas
-for col in quantidade_cols + valor_cols:
-    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-
-# ---------------------------------------------
-# Filtros Interativos
-# ---------------------------------------------
-st.sidebar.header("Filtros de Dados")
-
-# Filtro por Estado
-estados_disponiveis = ['Todos'] + sorted(df['uf_nome'].dropna().unique().tolist())
-estado_selecionado = st.sidebar.selectbox("Escolha o Estado:", estados_disponiveis)
-
-df_filtrado = df.copy()
-if estado_selecionado != 'Todos':
-    df_filtrado = df_filtrado[df_filtrado['uf_nome'] == estado_selecionado]
-
-# Filtro por Município
-municipios_disponiveis = ['Todos'] + sorted(df_filtrado['nome_municipio'].dropna().unique().tolist())
-municipio_selecionado = st.sidebar.selectbox("Escolha o Município:", municipios_disponiveis)
-
-if municipio_selecionado != 'Todos':
-    df_filtrado = df_filtrado[df_filtrado['nome_municipio'] == municipio_selecionado]
-
-
-# Filtro por Ano
-anos_disponiveis = ['Todos'] + sorted(df_filtrado['ano_aih'].unique())
-ano_selecionado = st.sidebar.selectbox("Selecione o Ano:", anos_disponiveis)
-
-if ano_selecionado != 'Todos':
-    ano_selecionado = int(ano_selecionado)  # Garantir que é inteiro
-    df_filtrado = df_filtrado[df_filtrado['ano_aih'] == ano_selecionado]
-
-# Verificar se há dados após os filtros
-if df_filtrado.empty:
-    st.warning("Nenhum dado encontrado com os filtros aplicados. Ajuste os filtros e tente novamente.")
-    st.stop()
-
-# ---------------------------------------------
-# Análise de Custos Totais
-# ---------------------------------------------
-st.subheader("Análise de Custos Totais")
-
-if valor_cols:
-    custos_totais = pd.DataFrame({
-        "Procedimento": valor_cols,
-        "Valor Total (R$)": [df_filtrado[col].sum() for col in valor_cols]
-    })
-
-    custos_totais = custos_totais.sort_values(by="Valor Total (R$)", ascending=False)
-    custos_totais["Valor Total (R$)"] = custos_totais["Valor Total (R$)"].apply(formatar_real)
-
-    st.write("Top Procedimentos por Valor Total:")
-    st.table(custos_totais.head(10))
-
-    fig = px.bar(
-        custos_totais.head(10),
-        x="Valor Total (R$)",
-        y="Procedimento",
-        orientation="h",
-        title="Top Procedimentos por Valor Total"
-    )
-    st.plotly_chart(fig)
-
-# ---------------------------------------------
-# Análise de Quantidades Totais
-# ---------------------------------------------
-st.subheader("Análise de Quantidades Totais")
-
-if quantidade_cols:
-    quantidades_totais = pd.DataFrame({
-        "Procedimento": quantidade_cols,
-        "Quantidade Total": [df_filtrado[col].sum() for col in quantidade_cols]
-    })
-
-    quantidades_totais = quantidades_totais.sort_values(by="Quantidade Total", ascending=False)
-    st.write("Top Procedimentos por Quantidade Total:")
-    st.table(quantidades_totais.head(10))
-
-    fig = px.bar(
-        quantidades_totais.head(10),
-        x="Quantidade Total",
-        y="Procedimento",
-        orientation="h",
-        title="Top Procedimentos por Quantidade Total"
-    )
-    st.plotly_chart(fig)
+from aggregate_cube import cube_totals, top_n, available_measures, unit_costs, population_band_measures
+from prepared_data import opcoes_estados, opcoes_municipios, opcoes_anos
+from column_metadata import measure_columns, column_registry
+from formatting import formatar_real
+
+# Função principal da página, chamada pelo registro de páginas do home.py
+def render():
+    # ---------------------------------------------
+    # Carregar as colunas disponíveis
+    # ---------------------------------------------
+    colunas = available_measures()
+
+    quantidade_cols = measure_columns('qtd', available=colunas)
+    valor_cols = measure_columns('vl', available=colunas)
+
+    # ---------------------------------------------
+    # Filtros Interativos
+    # ---------------------------------------------
+    st.sidebar.header("Filtros de Dados")
+
+    # Filtro por Estado
+    estados_disponiveis = ['Todos'] + opcoes_estados()
+    estado_selecionado = st.sidebar.selectbox("Escolha o Estado:", estados_disponiveis)
+
+    # Filtro por Município
+    municipios_disponiveis = ['Todos'] + opcoes_municipios(estado_selecionado)
+    municipio_selecionado = st.sidebar.selectbox("Escolha o Município:", municipios_disponiveis)
+
+    # Filtro por Ano
+    anos_disponiveis = ['Todos'] + opcoes_anos(estado_selecionado, municipio_selecionado)
+    ano_selecionado = st.sidebar.selectbox("Selecione o Ano:", anos_disponiveis)
+
+    # Somas dos blocos de quantidade e valor obtidas do cubo de agregados
+    somas = cube_totals(
+        quantidade_cols + valor_cols,
+        [{'uf': estado_selecionado, 'municipio': municipio_selecionado, 'anos': ano_selecionado}]
+    ).iloc[0]
+
+    # Verificar se há dados após os filtros
+    if somas['n_linhas'] == 0:
+        st.warning("Nenhum dado encontrado com os filtros aplicados. Ajuste os filtros e tente novamente.")
+        st.stop()
+
+    # ---------------------------------------------
+    # Análise de Custos Totais
+    # ---------------------------------------------
+    st.subheader("Análise de Custos Totais")
+
+    if valor_cols:
+        maiores = top_n(somas[valor_cols], 10)
+        custos_totais = pd.DataFrame({
+            "Procedimento": maiores.index,
+            "Valor Total (R$)": maiores.to_numpy()
+        })
+
+        custos_totais["Valor Total (R$)"] = formatar_real(custos_totais["Valor Total (R$)"])
+
+        st.write("Top Procedimentos por Valor Total:")
+        st.table(custos_totais.head(10))
+
+        fig = px.bar(
+            custos_totais.head(10),
+            x="Valor Total (R$)",
+            y="Procedimento",
+            orientation="h",
+            title="Top Procedimentos por Valor Total"
+        )
+        st.plotly_chart(fig)
+
+    # ---------------------------------------------
+    # Análise de Quantidades Totais
+    # ---------------------------------------------
+    st.subheader("Análise de Quantidades Totais")
+
+    if quantidade_cols:
+        maiores = top_n(somas[quantidade_cols], 10)
+        quantidades_totais = pd.DataFrame({
+            "Procedimento": maiores.index,
+            "Quantidade Total": maiores.to_numpy()
+        })
+
+        st.write("Top Procedimentos por Quantidade Total:")
+        st.table(quantidades_totais.head(10))
+
+        fig = px.bar(
+            quantidades_totais.head(10),
+            x="Quantidade Total",
+            y="Procedimento",
+            orientation="h",
+            title="Top Procedimentos por Quantidade Total"
+        )
+        st.plotly_chart(fig)
+
+    # ---------------------------------------------
+    # Custo Médio por Procedimento
+    # ---------------------------------------------
+    st.subheader("Custo Médio por Procedimento")
+
+    custos_unitarios = unit_costs(
+        uf=estado_selecionado, municipio=municipio_selecionado, anos=ano_selecionado
+    ).dropna()
+    if not custos_unitarios.empty:
+        maiores = top_n(custos_unitarios, 10)
+        st.write("Procedimentos com maior custo por procedimento realizado:")
+        st.table(pd.DataFrame({
+            "Procedimento": maiores.index,
+            "Custo por Procedimento (R$)": formatar_real(maiores.to_numpy())
+        }))
+
+    # ---------------------------------------------
+    # Comparação por Faixa Populacional
+    # ---------------------------------------------
+    por_faixa, custo_faixa = population_band_measures()
+    valor_total = column_registry().loc['vl_total', 'rotulo']
+    if por_faixa is not None and valor_total in por_faixa.columns:
+        st.subheader("Comparação por Faixa Populacional")
+        comparacao = pd.DataFrame({
+            "Valor médio por município": por_faixa[valor_total],
+            "Custo por procedimento": custo_faixa.get(valor_total),
+            "Municípios": por_faixa['n_municipios'],
+        }).reset_index()
+        if ano_selecionado != 'Todos':
+            comparacao = comparacao[comparacao['ano_aih'] == int(ano_selecionado)]
+
+        fig = px.line(
+            comparacao,
+            x="ano_aih",
+            y="Valor médio por município",
+            color="faixa_populacao",
+            markers=True,
+            title="Valor Médio por Município em cada Faixa Populacional"
+        )
+        st.plotly_chart(fig)
+        st.dataframe(comparacao)
+
+if __name__ == "__main__":
+    render()
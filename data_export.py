@@ -0,0 +1,129 @@
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+# Linhas escritas por vez: o pico de memória da exportação fica perto de um
+# bloco, independentemente do tamanho da seleção
+EXPORT_CHUNK_ROWS = int(os.environ.get('TCC_EXPORT_CHUNK_ROWS', 50000))
+
+# Seleções a partir deste tamanho são exportadas em segundo plano
+EXPORT_BACKGROUND_ROWS = int(os.environ.get('TCC_EXPORT_BACKGROUND_ROWS', 200000))
+
+# Pasta dos arquivos temporários de exportação
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), 'tcc_exports')
+
+# Idade máxima (em segundos) dos arquivos deixados na pasta de exportação,
+# por exemplo por sessões encerradas antes do download
+EXPORT_MAX_AGE_SECONDS = int(os.environ.get('TCC_EXPORT_MAX_AGE_SECONDS', 3600))
+
+# Formatos suportados: extensão e tipo MIME
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'Arrow': ('arrow', 'application/vnd.apache.arrow.file'),
+}
+
+# Uma exportação em segundo plano por vez, para não multiplicar o pico de memória
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tcc-export')
+_lock = threading.Lock()
+
+# Função para percorrer o DataFrame em blocos de EXPORT_CHUNK_ROWS linhas
+def _chunks(df):
+    for inicio in range(0, max(len(df), 1), EXPORT_CHUNK_ROWS):
+        yield df.iloc[inicio:inicio + EXPORT_CHUNK_ROWS]
+
+# Função para escrever o DataFrame no arquivo, bloco a bloco
+def write_export(df, formato, path):
+    if formato == 'CSV':
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            for i, bloco in enumerate(_chunks(df)):
+                bloco.to_csv(f, header=(i == 0), index=False)
+        return path
+
+    if formato not in ('Parquet', 'Arrow'):
+        raise ValueError(f"Formato de exportação não suportado: {formato}")
+
+    # O esquema vem do primeiro bloco com dados: um DataFrame vazio daria tipo
+    # null às colunas de texto. Os blocos seguintes são convertidos para ele.
+    blocos = (pa.Table.from_pandas(bloco, preserve_index=False) for bloco in _chunks(df))
+    primeiro = next(blocos)
+    schema = primeiro.schema
+    if formato == 'Parquet':
+        with pq.ParquetWriter(path, schema) as writer:
+            writer.write_table(primeiro)
+            for tabela in blocos:
+                writer.write_table(tabela.cast(schema))
+    else:
+        with pa.OSFile(path, 'wb') as sink:
+            with ipc.new_file(sink, schema) as writer:
+                writer.write_table(primeiro)
+                for tabela in blocos:
+                    writer.write_table(tabela.cast(schema))
+    return path
+
+# Função para apagar os arquivos da pasta de exportação modificados há mais de
+# EXPORT_MAX_AGE_SECONDS
+def remove_stale_exports(max_age=EXPORT_MAX_AGE_SECONDS):
+    limite = time.time() - max_age
+    try:
+        entradas = list(os.scandir(EXPORT_DIR))
+    except OSError:
+        return
+    for entrada in entradas:
+        try:
+            if entrada.is_file() and entrada.stat().st_mtime < limite:
+                os.remove(entrada.path)
+        except OSError:
+            pass
+
+# Função para iniciar uma exportação para um arquivo temporário.
+# Seleções pequenas são escritas na hora; as grandes ficam em segundo plano.
+# Retorna um Future com o caminho do arquivo.
+def start_export(df, formato):
+    extensao, _ = EXPORT_FORMATS[formato]
+    remove_stale_exports()
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=f'.{extensao}', dir=EXPORT_DIR)
+    os.close(fd)
+
+    if len(df) < EXPORT_BACKGROUND_ROWS:
+        future = Future()
+        try:
+            future.set_result(write_export(df, formato, path))
+        except Exception as e:
+            future.set_exception(e)
+    else:
+        with _lock:
+            future = _executor.submit(write_export, df, formato, path)
+    future.export_path = path
+    return future
+
+# Função para obter o conteúdo de uma exportação concluída. O arquivo é lido
+# uma única vez: os bytes ficam guardados com a exportação e o arquivo
+# temporário é apagado em seguida.
+def export_bytes(future):
+    dados = getattr(future, 'export_data', None)
+    if dados is None:
+        with open(future.result(), 'rb') as arquivo:
+            dados = arquivo.read()
+        future.export_data = dados
+        _remove_export(future)
+    return dados
+
+# Função para apagar o arquivo temporário de uma exportação
+def _remove_export(future):
+    try:
+        os.remove(future.export_path)
+    except OSError:
+        pass
+
+# Função para descartar uma exportação: o arquivo é apagado agora, se ela já
+# terminou, ou assim que terminar, se ainda estiver em andamento
+def discard_export(future):
+    if future is not None:
+        future.add_done_callback(_remove_export)
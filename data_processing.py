@@ -1,6 +1,75 @@
 import asyncio
+import collections
+import functools
+import logging
+import os
+import threading
+import time
 import asyncpg
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from snapshot import (
+    read_arrow, read_snapshot, write_snapshot, touch_snapshot, snapshot_age, max_period, merge_snapshot,
+    query_table, distinct_filters, aggregate_table,
+)
+from spans import span, CARGA, PREPROCESSAMENTO
+
+logger = logging.getLogger(__name__)
+
+# Configuração de acesso ao banco de dados; as variáveis de ambiente permitem
+# apontar para um Postgres local (ex.: carregado por synthetic_data.py)
+DB_CONFIG = {
+    'user': os.environ.get('TCC_DB_USER', 'Data_IESB'),
+    'password': os.environ.get('TCC_DB_PASSWORD', 'DATA_IESB'),
+    'database': os.environ.get('TCC_DB_NAME', 'Data_IESB'),
+    'host': os.environ.get('TCC_DB_HOST', 'dataiesb.iesbtech.com.br'),
+    'port': int(os.environ.get('TCC_DB_PORT', 5432)),
+}
+
+# Origem dos dados: 'postgres' (banco, com snapshot local), 'file' (arquivo
+# .arrow/.parquet/.csv em TCC_DATA_FILE), 'memory' (tabela registrada com
+# set_memory_table) ou 'synthetic' (gerada por synthetic_data.py)
+DATA_SOURCE = os.environ.get('TCC_DATA_SOURCE', 'postgres')
+DATA_FILE = os.environ.get('TCC_DATA_FILE')
+
+# Tamanho dos dados sintéticos: municípios, anos ("2019-2024") e meses por ano
+SYNTHETIC_MUNICIPIOS = int(os.environ.get('TCC_SYNTHETIC_MUNICIPIOS', 50))
+SYNTHETIC_ANOS = os.environ.get('TCC_SYNTHETIC_ANOS', '2019-2024')
+SYNTHETIC_MESES = int(os.environ.get('TCC_SYNTHETIC_MESES', 12))
+
+# Tamanho do pool de conexões e tempo máximo (em segundos) de espera por uma
+# conexão livre; podem ser ajustados por variáveis de ambiente
+POOL_MIN_SIZE = int(os.environ.get('TCC_POOL_MIN_SIZE', 1))
+POOL_MAX_SIZE = int(os.environ.get('TCC_POOL_MAX_SIZE', 10))
+POOL_ACQUIRE_TIMEOUT = float(os.environ.get('TCC_POOL_ACQUIRE_TIMEOUT', 30))
+
+# Snapshot local da tabela: quando habilitado, as páginas leem do disco e o
+# banco só é consultado, de forma incremental, a cada SNAPSHOT_REFRESH_SECONDS
+SNAPSHOT_ENABLED = os.environ.get('TCC_SNAPSHOT', '1') != '0'
+SNAPSHOT_REFRESH_SECONDS = float(os.environ.get('TCC_SNAPSHOT_REFRESH_SECONDS', 600))
+
+# Quantidade de linhas lidas por vez do cursor no servidor; limita o pico de
+# memória durante a carga a aproximadamente um lote
+FETCH_CHUNK_SIZE = int(os.environ.get('TCC_FETCH_CHUNK_SIZE', 20000))
+
+# Cargas completas: coluna usada para dividir a tabela em partições e quantas
+# partições são lidas ao mesmo tempo (cada uma em uma conexão do pool)
+FETCH_PARTITION_BY = os.environ.get('TCC_FETCH_PARTITION_BY', 'ano_aih')
+FETCH_PARALLELISM = int(os.environ.get('TCC_FETCH_PARALLELISM', POOL_MAX_SIZE))
+
+# Cache de resultados: tempo (em segundos) durante o qual a marca d'água da
+# origem é considerada válida e número máximo de resultados guardados
+CACHE_TTL_SECONDS = float(os.environ.get('TCC_CACHE_TTL_SECONDS', 300))
+CACHE_MAX_ENTRIES = int(os.environ.get('TCC_CACHE_MAX_ENTRIES', 32))
+
+# Tabela de origem e consulta base
+TABLE_NAME = "saude_ride_tcc_luis"
+BASE_QUERY = f"SELECT * FROM {TABLE_NAME}"
+
+# Valor usado pelas páginas para indicar "sem filtro"
+TODOS = 'Todos'
+
 # Dicionário de renomeação (mapeamento das colunas)
 rename_mapping = {
     'qtd_0101': 'Quantidade de Ações coletivas/individuais em saúde',
@@ -117,29 +186,469 @@ rename_mapping = {
     "QTD_0101": "Ações coletivas/individuais em saúde",
 }
 
+# ---------------------------------------------
+# Pool de conexões compartilhado pelo processo
+# ---------------------------------------------
+# O pool do asyncpg fica preso ao event loop em que foi criado. Como cada
+# rerun do Streamlit roda em uma thread diferente, mantemos um único loop em
+# uma thread de fundo e enviamos todas as consultas para ele.
+_loop = None
+_loop_lock = threading.Lock()
+_pool_task = None
+
+def _get_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="tcc-db-loop", daemon=True).start()
+    return _loop
+
+# Função para executar uma corrotina no loop compartilhado e aguardar o resultado
+def run_async(coro):
+    with span(CARGA, getattr(coro, '__qualname__', None)):
+        return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+# Função executada em cada nova conexão do pool.
+# NUMERIC é decodificado como float em vez de Decimal: os valores só são usados
+# em cálculos com pandas e o snapshot precisa de um tipo estável entre cargas.
+async def _init_connection(conn):
+    await conn.set_type_codec(
+        'numeric', encoder=str, decoder=float, schema='pg_catalog', format='text'
+    )
+
+# Função para obter o pool (criado uma única vez, na primeira chamada)
+async def get_pool():
+    global _pool_task
+    if _pool_task is None:
+        _pool_task = asyncio.ensure_future(asyncpg.create_pool(
+            min_size=POOL_MIN_SIZE,
+            max_size=POOL_MAX_SIZE,
+            init=_init_connection,
+            **DB_CONFIG
+        ))
+    try:
+        return await _pool_task
+    except Exception:
+        # Permitir uma nova tentativa na próxima chamada
+        _pool_task = None
+        raise
+
+# Função para fechar o pool (por exemplo, ao encerrar scripts em lote)
+async def close_pool():
+    global _pool_task
+    if _pool_task is not None:
+        pool = await _pool_task
+        _pool_task = None
+        await pool.close()
+
+# ---------------------------------------------
+# Leitura em lotes com tipos fixos
+# ---------------------------------------------
+# Tipos do Postgres -> tipos do Arrow (NUMERIC já chega como float, ver acima)
+_ARROW_TYPES = {
+    'int2': pa.int16(),
+    'int4': pa.int32(),
+    'int8': pa.int64(),
+    'float4': pa.float32(),
+    'float8': pa.float64(),
+    'numeric': pa.float64(),
+    'bool': pa.bool_(),
+    'text': pa.string(),
+    'varchar': pa.string(),
+    'bpchar': pa.string(),
+    'name': pa.string(),
+    'date': pa.date32(),
+    'timestamp': pa.timestamp('us'),
+    'timestamptz': pa.timestamp('us', tz='UTC'),
+}
+
+# Função para montar o schema Arrow a partir das colunas da consulta.
+# Retorna também as posições das colunas de tipos não mapeados, lidas como texto.
+def _arrow_schema(attributes):
+    fields, as_text = [], set()
+    for i, attr in enumerate(attributes):
+        arrow_type = _ARROW_TYPES.get(attr.type.name)
+        if arrow_type is None:
+            arrow_type = pa.string()
+            as_text.add(i)
+        fields.append((attr.name, arrow_type))
+    return pa.schema(fields), as_text
+
+# Função para converter um lote de registros em buffers tipados por coluna
+def _rows_to_batch(rows, schema, as_text):
+    arrays = []
+    for i, field in enumerate(schema):
+        values = [row[i] for row in rows]
+        if i in as_text:
+            values = [None if value is None else str(value) for value in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+# Função para carregar o resultado de uma consulta como tabela Arrow, lendo
+# em lotes de `chunk_size` linhas por um cursor no servidor. Só um lote de
+# registros Python existe em memória por vez.
+async def fetch_table(query=BASE_QUERY, *args, chunk_size=None):
+    chunk_size = chunk_size or FETCH_CHUNK_SIZE
+    pool = await get_pool()
+    batches = []
+    # Aguarda no máximo POOL_ACQUIRE_TIMEOUT segundos por uma conexão livre
+    async with pool.acquire(timeout=POOL_ACQUIRE_TIMEOUT) as conn:
+        stmt = await conn.prepare(query)
+        # Schema vem da consulta, mesmo quando não há linhas
+        schema, as_text = _arrow_schema(stmt.get_attributes())
+        # Cursores no servidor só existem dentro de uma transação
+        async with conn.transaction(readonly=True):
+            cursor = await stmt.cursor(*args)
+            while True:
+                rows = await cursor.fetch(chunk_size)
+                if not rows:
+                    break
+                batches.append(_rows_to_batch(rows, schema, as_text))
+    return pa.Table.from_batches(batches, schema=schema)
+
+# Expressões SQL das colunas de partição
+_PARTITION_SQL = {
+    'ano_aih': 'ano_aih::int',
+    'uf_nome': 'uf_nome',
+}
+
+# Função para carregar a tabela inteira (ou só as colunas pedidas) dividida em
+# partições por ano_aih ou uf_nome, lidas em paralelo por conexões diferentes
+# do pool. As tabelas das partições são concatenadas sem copiar os buffers.
+async def fetch_table_partitioned(columns=None, by=None, parallelism=None):
+    by = by or FETCH_PARTITION_BY
+    if by not in _PARTITION_SQL:
+        raise ValueError(f"Coluna de partição não suportada: {by}")
+    expr = _PARTITION_SQL[by]
+    select = "*" if columns is None else ", ".join(_quote(col) for col in columns)
+    query = f"SELECT {select} FROM {TABLE_NAME}"
+
+    pool = await get_pool()
+    async with pool.acquire(timeout=POOL_ACQUIRE_TIMEOUT) as conn:
+        keys = [row[0] for row in await conn.fetch(f"SELECT DISTINCT {expr} FROM {TABLE_NAME} ORDER BY 1")]
+    if not keys:
+        return await fetch_table(query)
+
+    # Limita as partições simultâneas para não esgotar o pool
+    semaphore = asyncio.Semaphore(min(parallelism or FETCH_PARALLELISM, POOL_MAX_SIZE))
+
+    async def fetch_partition(key):
+        async with semaphore:
+            if key is None:
+                return await fetch_table(f"{query} WHERE {expr} IS NULL")
+            return await fetch_table(f"{query} WHERE {expr} = $1", key)
+
+    tables = await asyncio.gather(*(fetch_partition(key) for key in keys))
+    return pa.concat_tables(tables)
+
 # Função para carregar os dados do banco de dados
-async def fetch_data():
-    conn = await asyncpg.connect(
-        user='Data_IESB', 
-        password='DATA_IESB', 
-        database='Data_IESB', 
-        host='dataiesb.iesbtech.com.br'
+async def fetch_data(query=BASE_QUERY, *args, chunk_size=None):
+    table = await fetch_table(query, *args, chunk_size=chunk_size)
+    # Convertendo para DataFrame, liberando os buffers Arrow coluna a coluna
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+# ---------------------------------------------
+# Snapshot local com atualização incremental
+# ---------------------------------------------
+_snapshot_lock = threading.Lock()
+
+# Função para atualizar o snapshot e retorná-lo mapeado em memória.
+# Só busca no banco as linhas a partir do maior (ano_aih, mes_aih) já salvo.
+def refresh_snapshot(force=False):
+    with _snapshot_lock:
+        table = read_snapshot()
+        if table is not None and not force and snapshot_age() < SNAPSHOT_REFRESH_SECONDS:
+            return table
+
+        try:
+            period = max_period(table)
+            if period is None:
+                write_snapshot(run_async(fetch_table_partitioned()))
+            else:
+                query = BASE_QUERY + " WHERE (ano_aih::int, mes_aih::int) >= ($1, $2)"
+                new_rows = run_async(fetch_table(query, *period))
+                write_snapshot(merge_snapshot(table, new_rows, period))
+        except Exception:
+            if table is None:
+                raise
+            # Sem acesso ao banco: seguir com o snapshot existente
+            logger.warning("Falha ao atualizar o snapshot; usando a versão local.", exc_info=True)
+            touch_snapshot()
+            return table
+
+        # Reabrir a partir do disco para que a tabela volte a ser mapeada
+        return read_snapshot()
+
+# ---------------------------------------------
+# Origens locais dos dados (arquivo, memória, sintética)
+# ---------------------------------------------
+_memory_table = None
+_synthetic_table = None
+
+# Função para registrar a tabela usada pela origem 'memory' (Arrow ou pandas)
+def set_memory_table(data):
+    global _memory_table
+    if not isinstance(data, pa.Table):
+        data = pa.Table.from_pandas(data, preserve_index=False)
+    _memory_table = data
+
+# Função para ler um arquivo de dados conforme a extensão
+def read_data_file(path):
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return pq.read_table(path, memory_map=True)
+    if path.endswith('.csv'):
+        import pyarrow.csv as csv
+        return csv.read_csv(path)
+    # Arrow IPC: mesmo formato do snapshot, lido mapeado em memória
+    return read_arrow(path)
+
+# Função para gerar (uma vez por processo) a tabela sintética
+def _get_synthetic_table():
+    global _synthetic_table
+    if _synthetic_table is None:
+        # Importado aqui: synthetic_data depende deste módulo
+        from synthetic_data import generate_table, parse_anos
+        _synthetic_table = generate_table(
+            SYNTHETIC_MUNICIPIOS, parse_anos(SYNTHETIC_ANOS), SYNTHETIC_MESES
+        )
+    return _synthetic_table
+
+# Função para indicar se há uma tabela local (snapshot, arquivo, memória ou
+# sintética). Sem ela (origem 'postgres' sem snapshot), as agregações são
+# calculadas no banco, sem trazer a tabela inteira.
+def has_local_source():
+    return not (DATA_SOURCE == 'postgres' and not SNAPSHOT_ENABLED)
+
+# Função para obter a tabela local da origem configurada, ou None quando as
+# consultas devem ir direto ao banco (origem 'postgres' sem snapshot)
+def source_table():
+    if DATA_SOURCE == 'postgres':
+        return refresh_snapshot() if SNAPSHOT_ENABLED else None
+    if DATA_SOURCE == 'file':
+        if not DATA_FILE:
+            raise ValueError("TCC_DATA_FILE deve apontar para o arquivo de dados.")
+        table = read_data_file(DATA_FILE)
+        if table is None:
+            raise FileNotFoundError(DATA_FILE)
+        return table
+    if DATA_SOURCE == 'memory':
+        if _memory_table is None:
+            raise ValueError("Nenhuma tabela registrada com set_memory_table.")
+        return _memory_table
+    if DATA_SOURCE == 'synthetic':
+        return _get_synthetic_table()
+    raise ValueError(f"Origem de dados não suportada: {DATA_SOURCE}")
+
+# ---------------------------------------------
+# Cache de resultados validado pela marca d'água da origem
+# ---------------------------------------------
+# Cada resultado é guardado junto com a marca d'água (maior (ano_aih, mes_aih)
+# e quantidade de linhas) lida quando foi calculado. A marca d'água é relida no
+# máximo a cada CACHE_TTL_SECONDS; se mudou, os resultados antigos deixam de
+# ser usados, sem recarregar nada enquanto a origem continuar igual.
+_cache = collections.OrderedDict()
+_cache_lock = threading.Lock()
+_watermark = None
+_watermark_time = 0.0
+
+# Função para calcular a marca d'água da origem configurada
+def compute_watermark():
+    local = source_table()
+    if local is not None:
+        return (max_period(local), local.num_rows)
+    query = (
+        f"SELECT MAX(ano_aih::int * 100 + mes_aih::int) AS periodo, COUNT(*) AS n_linhas "
+        f"FROM {TABLE_NAME}"
     )
-    query = "SELECT * FROM saude_ride_tcc_luis"
-    rows = await conn.fetch(query)
-    await conn.close()
-    
-    # Convertendo para DataFrame
-    df = pd.DataFrame(rows, columns=[col for col in rows[0].keys()])
+    row = run_async(fetch_data(query)).iloc[0]
+    periodo = None if pd.isna(row['periodo']) else divmod(int(row['periodo']), 100)
+    return (periodo, int(row['n_linhas']))
+
+# Função para obter a marca d'água, relida só depois de CACHE_TTL_SECONDS
+def data_watermark():
+    global _watermark, _watermark_time
+    with _cache_lock:
+        if _watermark is not None and time.monotonic() - _watermark_time < CACHE_TTL_SECONDS:
+            return _watermark
+    watermark = compute_watermark()
+    with _cache_lock:
+        _watermark, _watermark_time = watermark, time.monotonic()
+    return watermark
+
+# Função para transformar listas dos argumentos em tuplas (chave do cache)
+def _freeze(value):
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+# Decorador que guarda os resultados da função no cache (LRU limitado a
+# CACHE_MAX_ENTRIES), com a chave formada pelos argumentos e pela marca d'água
+def watermark_cache(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (func.__name__, _freeze(args), _freeze(sorted(kwargs.items())))
+        watermark = data_watermark()
+        with _cache_lock:
+            entry = _cache.get(key)
+            if entry is not None and entry[0] == watermark:
+                _cache.move_to_end(key)
+                value = entry[1]
+            else:
+                value = None
+        if value is None:
+            value = func(*args, **kwargs)
+            with _cache_lock:
+                _cache[key] = (watermark, value)
+                _cache.move_to_end(key)
+                while len(_cache) > CACHE_MAX_ENTRIES:
+                    _cache.popitem(last=False)
+        # Cópias rasas: alterações de quem chamou não chegam ao cache
+        if isinstance(value, pd.DataFrame):
+            return value.copy(deep=False)
+        return list(value) if isinstance(value, list) else value
+    return wrapper
+
+# Função para descartar os resultados guardados e a marca d'água
+def invalidate_cache():
+    global _watermark
+    with _cache_lock:
+        _cache.clear()
+        _watermark = None
+
+# Função para a ação "atualizar dados": busca as novidades no banco (quando a
+# origem é o Postgres com snapshot) e descarta o cache
+def refresh_data():
+    if DATA_SOURCE == 'postgres' and SNAPSHOT_ENABLED:
+        refresh_snapshot(force=True)
+    invalidate_cache()
+    return data_watermark()
+
+# ---------------------------------------------
+# Filtros e projeção de colunas no banco
+# ---------------------------------------------
+# Mapeamento inverso: nome exibido -> nome da coluna na tabela
+_raw_names = {label: raw for raw, label in rename_mapping.items()}
+
+# Função para normalizar um filtro em lista (None ou 'Todos' = sem filtro).
+# Usada por todas as consultas com filtros de estado, município e ano.
+def as_list(values):
+    if values is None or (isinstance(values, str) and values == TODOS):
+        return None
+    if isinstance(values, str) or not hasattr(values, '__iter__'):
+        return [values]
+    return list(values)
+
+# Função para converter nomes exibidos nos nomes das colunas da tabela
+def _resolve_columns(columns):
+    if columns is None:
+        return None
+    return list(dict.fromkeys(_raw_names.get(col, col) for col in columns))
+
+# Função para colocar um identificador entre aspas na consulta SQL
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+# Função para montar a cláusula WHERE parametrizada
+def _build_where(uf=None, municipio=None, anos=None, args=None):
+    args = [] if args is None else args
+    conditions = []
+    if uf is not None:
+        args.append(list(uf))
+        conditions.append(f"uf_nome = ANY(${len(args)}::text[])")
+    if municipio is not None:
+        args.append(list(municipio))
+        conditions.append(f"nome_municipio = ANY(${len(args)}::text[])")
+    if anos is not None:
+        args.append([int(ano) for ano in anos])
+        conditions.append(f"ano_aih::int = ANY(${len(args)}::int[])")
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    return where, args
+
+# Função para montar a consulta com a lista de colunas e os filtros
+def build_query(columns=None, uf=None, municipio=None, anos=None):
+    select = "*" if columns is None else ", ".join(_quote(col) for col in columns)
+    where, args = _build_where(uf, municipio, anos)
+    return f"SELECT {select} FROM {TABLE_NAME}{where}", args
+
+# ---------------------------------------------
+# Schema compacto aplicado na carga
+# ---------------------------------------------
+# Quantidades (qtd_*) como inteiros de 32 bits, valores (vl_*) como float32 e
+# estado/município como categorias do pandas
+COUNT_TYPE = pa.int32()
+VALUE_TYPE = pa.float32()
+CATEGORY_COLUMNS = ('uf_nome', 'nome_municipio')
+
+# Função para obter o tipo compacto de uma coluna (None = manter o original)
+def compact_type(column):
+    name = column.lower()
+    if name.startswith('qtd_'):
+        return COUNT_TYPE
+    if name.startswith('vl_'):
+        return VALUE_TYPE
+    return None
+
+# Função para listar os nomes exibidos das medidas (qtd_* e vl_*)
+def measure_labels():
+    return [label for raw, label in rename_mapping.items() if compact_type(raw) is not None]
+
+# Função para converter a tabela Arrow em DataFrame já com os tipos compactos.
+# A conversão é feita no Arrow, coluna a coluna, sem passar por float64/object.
+def apply_schema(table):
+    columns = []
+    for name, column in zip(table.column_names, table.columns):
+        target = compact_type(name)
+        if target == COUNT_TYPE:
+            # Quantidades vindas como float são arredondadas antes da conversão;
+            # a conversão segura falha em vez de truncar valores fora do int32
+            column = pc.fill_null(column, 0)
+            if pa.types.is_floating(column.type) or pa.types.is_decimal(column.type):
+                column = pc.round(column)
+            column = pc.cast(column, target)
+        elif target is not None:
+            # float64 -> float32: a perda de precisão é a compactação desejada
+            column = pc.cast(pc.fill_null(column, 0), target, safe=False)
+        elif name in CATEGORY_COLUMNS and (pa.types.is_string(column.type) or pa.types.is_large_string(column.type)):
+            column = column.dictionary_encode()
+        columns.append(column)
+    df = pa.table(columns, names=table.column_names).to_pandas(split_blocks=True)
+
+    # Demais colunas: substituir valores nulos por 0, como antes
+    outras = [
+        name for name in df.columns
+        if compact_type(name) is None and name not in CATEGORY_COLUMNS
+    ]
+    if outras:
+        df[outras] = df[outras].fillna(0)
     return df
 
-# Função para carregar e processar os dados
-def load_data():
-    # Carregar dados assíncronos
-    df = asyncio.run(fetch_data())
+# Função para carregar e processar os dados.
+# Aceita a lista de colunas desejadas (nomes exibidos ou originais) e filtros
+# por estado, município e ano, que são aplicados antes da transferência.
+@watermark_cache
+def load_data(columns=None, uf=None, municipio=None, anos=None):
+    columns = _resolve_columns(columns)
+    uf, municipio, anos = as_list(uf), as_list(municipio), as_list(anos)
+    if anos is not None:
+        anos = [int(ano) for ano in anos]
+
+    # Carregar da origem local (snapshot, arquivo, memória) ou direto do banco
+    with span(CARGA, f"load_data ({DATA_SOURCE})"):
+        local = source_table()
+        if local is not None:
+            table = query_table(local, columns, uf, municipio, anos)
+        elif uf is None and municipio is None and anos is None:
+            # Carga completa: partições lidas em paralelo
+            table = run_async(fetch_table_partitioned(columns))
+        else:
+            query, args = build_query(columns, uf, municipio, anos)
+            table = run_async(fetch_table(query, *args))
 
-    # Substituir valores nulos por 0
-    df = df.fillna(0)
+    # Aplicar o schema compacto e substituir valores nulos por 0
+    with span(PREPROCESSAMENTO, 'apply_schema'):
+        df = apply_schema(table)
 
     # Renomear as colunas do DataFrame
     df = df.rename(columns=rename_mapping)
@@ -147,6 +656,90 @@ def load_data():
     # Retornar o DataFrame processado
     return df
 
+# Função para carregar as combinações distintas de estado, município e ano,
+# usadas para montar os filtros das páginas sem trazer a tabela inteira
+@watermark_cache
+def load_filter_options():
+    local = source_table()
+    if local is not None:
+        df = distinct_filters(local).to_pandas()
+    else:
+        query = (
+            f"SELECT DISTINCT uf_nome, nome_municipio, ano_aih::int AS ano_aih "
+            f"FROM {TABLE_NAME} WHERE ano_aih IS NOT NULL"
+        )
+        df = run_async(fetch_data(query))
+    df = df.dropna(subset=['ano_aih'])
+    df['ano_aih'] = df['ano_aih'].astype(int)
+    return df.sort_values(['uf_nome', 'nome_municipio', 'ano_aih']).reset_index(drop=True)
+
+# Função para listar as colunas disponíveis na tabela (com nomes exibidos)
+@watermark_cache
+def load_table_columns():
+    local = source_table()
+    if local is not None:
+        columns = local.schema.names
+    else:
+        query = (
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_name = $1 ORDER BY ordinal_position"
+        )
+        columns = run_async(fetch_data(query, TABLE_NAME))['column_name'].tolist()
+    return [rename_mapping.get(col, col) for col in columns]
+
+# ---------------------------------------------
+# Agregações calculadas no banco
+# ---------------------------------------------
+# Funções de agregação suportadas e expressões SQL das dimensões de agrupamento
+AGGREGATE_FUNCTIONS = {'mean': 'AVG', 'sum': 'SUM'}
+_DIMENSION_SQL = {
+    'uf_nome': 'uf_nome',
+    'nome_municipio': 'nome_municipio',
+    'ano_aih': 'ano_aih::int',
+    'mes_aih': 'mes_aih::int',
+}
+
+# Função para montar a consulta de agregação (nulos contam como 0)
+def build_aggregate_query(measures, by=(), agg='mean', uf=None, municipio=None, anos=None):
+    func = AGGREGATE_FUNCTIONS[agg]
+    select = [f"{_DIMENSION_SQL[dim]} AS {dim}" for dim in by]
+    select += [f"{func}(COALESCE({_quote(col)}, 0))::float8 AS {_quote(col)}" for col in measures]
+    select.append("COUNT(*) AS n_linhas")
+    where, args = _build_where(uf, municipio, anos)
+    where += (" AND " if where else " WHERE ") + "ano_aih IS NOT NULL"
+    query = f"SELECT {', '.join(select)} FROM {TABLE_NAME}{where}"
+    if by:
+        positions = ", ".join(str(i + 1) for i in range(len(by)))
+        query += f" GROUP BY {positions} ORDER BY {positions}"
+    return query, args
+
+# Função para carregar medidas já agregadas (média ou soma), agrupadas pelas
+# dimensões em `by` ('uf_nome', 'nome_municipio', 'ano_aih', 'mes_aih').
+# Usa os mesmos filtros de load_data; a coluna 'n_linhas' traz a quantidade de
+# linhas de origem de cada grupo.
+@watermark_cache
+def load_aggregates(measures, by=None, agg='mean', uf=None, municipio=None, anos=None):
+    if agg not in AGGREGATE_FUNCTIONS:
+        raise ValueError(f"Agregação não suportada: {agg}")
+    by = list(by or [])
+    for dim in by:
+        if dim not in _DIMENSION_SQL:
+            raise ValueError(f"Dimensão de agrupamento não suportada: {dim}")
+    measures = _resolve_columns(measures)
+    uf, municipio, anos = as_list(uf), as_list(municipio), as_list(anos)
+    if anos is not None:
+        anos = [int(ano) for ano in anos]
+
+    local = source_table()
+    if local is not None:
+        table = query_table(local, None, uf, municipio, anos)
+        df = aggregate_table(table, measures, by, agg).to_pandas()
+    else:
+        query, args = build_aggregate_query(measures, by, agg, uf, municipio, anos)
+        df = run_async(fetch_data(query, *args))
+
+    return df.rename(columns=rename_mapping)
+
 # Função para carregar o dicionário de renomeação
 def load_rename_mapping():
     return rename_mapping
\ No newline at end of file
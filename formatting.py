@@ -0,0 +1,57 @@
+import functools
+import math
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------
+# Formatação de valores no padrão brasileiro (pt_BR)
+# ---------------------------------------------
+# Aceita um número ou um array/Series inteiro. Arrays são formatados pelos
+# valores distintos (np.unique) e cada valor distinto passa por uma tabela de
+# memorização, de modo que tabelas grandes com valores repetidos custam uma
+# formatação por valor, e não uma por célula.
+
+# Prefixo da moeda, com espaço não separável como no babel
+MOEDA = "R$\xa0"
+
+# Troca os separadores do formato em inglês (1,234.56) pelos do pt_BR (1.234,56)
+_SEPARADORES = str.maketrans(",.", ".,")
+
+# Tamanho da tabela de memorização de cada formatador
+MEMO_SIZE = 65536
+
+# Função para formatar um número em reais (R$ 1.234,56)
+@functools.lru_cache(maxsize=MEMO_SIZE)
+def _real(valor):
+    if not math.isfinite(valor):
+        return ""
+    texto = MOEDA + f"{abs(valor):,.2f}".translate(_SEPARADORES)
+    return "-" + texto if valor < 0 else texto
+
+# Função para formatar uma quantidade inteira (1.234.567)
+@functools.lru_cache(maxsize=MEMO_SIZE)
+def _quantidade(valor):
+    if not math.isfinite(valor):
+        return ""
+    return f"{valor:,.0f}".translate(_SEPARADORES)
+
+# Função para aplicar um formatador a um número, array ou Series, formatando
+# apenas os valores distintos
+def _formatar(valores, formatador, casas):
+    if np.ndim(valores) == 0:
+        return formatador(round(float(valores), casas))
+    array = np.round(np.asarray(valores, dtype=np.float64), casas)
+    distintos, posicoes = np.unique(array, return_inverse=True)
+    textos = np.array([formatador(valor) for valor in distintos.tolist()], dtype=object)
+    resultado = textos[posicoes.reshape(array.shape)]
+    if isinstance(valores, pd.Series):
+        return pd.Series(resultado, index=valores.index, name=valores.name)
+    return resultado
+
+# Função para formatar valores em reais
+def formatar_real(valores):
+    return _formatar(valores, _real, 2)
+
+# Função para formatar quantidades
+def formatar_quantidade(valores):
+    return _formatar(valores, _quantidade, 0)
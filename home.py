@@ -1,5 +1,13 @@
+import time
+_inicio_home = time.perf_counter()
+
 import streamlit as st
-import os
+from page_registry import ANALYSIS_PAGES, MODEL_PAGES, PAGES, render_page
+from startup_report import import_report, record
+from spans import start_run, run_spans, span, RENDERIZACAO, PAINEL_DESEMPENHO
+
+# Iniciar a coleta de medições deste rerun
+start_run()
 
 # Inicializar o estado da página atual
 if "current_page" not in st.session_state:
@@ -54,70 +62,40 @@ st.markdown('<h1 class="main-title">Bem-vindo ao Sistema de Análise de Interna
 st.markdown('<p class="sub-title">Escolha uma análise para explorar os dados sobre internações hospitalares na RIDE de Brasília.</p>', unsafe_allow_html=True)
 
 # Botões organizados
-col1, col2 ,col3, col4,col5 = st.columns(5)
-
-# Definir os redirecionamentos
-if col1.button("📊 Análise Descritiva e Estatística"):
-    st.session_state["current_page"] = "descriptive_analysis"
-
-if col2.button("🔍 Visualização de Dados"):
-    st.session_state["current_page"] = "visualizacao"    
-
-if col3.button("💰 Análise de Custos"):
-    st.session_state["current_page"] = "cost_analysis"
-
-if col4.button("📅 Análise Temporal e Sazonal"):
-    st.session_state["current_page"] = "temporal_analysis"
-
-if col5.button("🗺️ Distribuição Geográfica"):
-    st.session_state["current_page"] = "geographic_distribution"
+for col, (page, label) in zip(st.columns(len(ANALYSIS_PAGES)), ANALYSIS_PAGES.items()):
+    if col.button(label):
+        st.session_state["current_page"] = page
 
 st.markdown('<p class="sub-title">Escolha uma modelagem para explorar os dados sobre internações hospitalares na RIDE de Brasília.</p>', unsafe_allow_html=True)
 
-col6,col7, col8, col9, col10 = st.columns(5)
-
-if col6.button("📅 Modelo de Série Temporal - MST"):
-    st.session_state["current_page"] = "modelo_serie_temporal"
-
-if col7.button("📊 Método K-Means"):
-    st.session_state["current_page"] = "k_means"
+for col, (page, label) in zip(st.columns(len(MODEL_PAGES)), MODEL_PAGES.items()):
+    if col.button(label):
+        st.session_state["current_page"] = page
 
-if col8.button("📈 Regressão Linear"):
-    st.session_state["current_page"] = "regressao_linear"
+# Tempo até o primeiro desenho da home (sem a página selecionada)
+if "home_first_paint" not in st.session_state:
+    st.session_state["home_first_paint"] = time.perf_counter() - _inicio_home
+    record("home (primeiro desenho)", st.session_state["home_first_paint"])
 
-if col9.button("💡 Gradient Boosting"):
-    st.session_state["current_page"] = "gradient_boosting"
+# Atualizar dados: buscar novidades na origem e descartar os resultados em
+# cache (consultas, conjunto preparado, índice de filtros e cubo)
+if st.sidebar.button("🔄 Atualizar dados"):
+    # Importado só aqui para não carregar a camada de dados na home
+    from data_processing import refresh_data
+    refresh_data()
+    st.cache_resource.clear()
 
-if col10.button("🌲 Random Forest"):
-    st.session_state["current_page"] = "random_forest"
+# Relatório de inicialização: tempo de importação de cada módulo
+with st.sidebar.expander("⏱️ Relatório de inicialização"):
+    st.dataframe(import_report(), hide_index=True)
 
 # Redirecionar para a página correspondente
-if st.session_state["current_page"] == "descriptive_analysis":
-    exec(open("descriptive_analysis.py", encoding="utf-8").read())
-
-elif st.session_state["current_page"] == "cost_analysis":
-    exec(open("cost_analysis.py", encoding="utf-8").read())
-
-elif st.session_state["current_page"] == "temporal_analysis":
-    exec(open("temporal_analysis.py", encoding="utf-8").read())
-
-elif st.session_state["current_page"] == "geographic_distribution":
-    exec(open("geographic_distribution.py", encoding="utf-8").read())
-
-elif st.session_state["current_page"] == "modelo_serie_temporal":
-    exec(open("modelo_serie_temporal.py", encoding="utf-8").read())
-
-elif st.session_state["current_page"] == "regressao_linear":
-    exec(open("regressao_linear.py", encoding="utf-8").read())
-
-elif st.session_state["current_page"] == "k_means":
-    exec(open("k_means.py", encoding="utf-8").read())
-
-elif st.session_state["current_page"] == "random_forest":
-    exec(open("random_forest.py", encoding="utf-8").read())
-
-elif st.session_state["current_page"] == "gradient_boosting":
-    exec(open("gradient_boosting.py", encoding="utf-8").read())
-
-elif st.session_state["current_page"] == "visualizacao":
-    exec(open("visualizacao.py", encoding="utf-8").read())
\ No newline at end of file
+try:
+    if st.session_state["current_page"] in PAGES:
+        with span(RENDERIZACAO, st.session_state["current_page"]):
+            render_page(st.session_state["current_page"])
+finally:
+    # Painel de desempenho: etapas medidas neste rerun (também após st.stop())
+    if PAINEL_DESEMPENHO:
+        with st.sidebar.expander("⚙️ Desempenho"):
+            st.dataframe(run_spans(), hide_index=True)
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.metrics import (
+    mean_absolute_error, mean_squared_error, r2_score,
+    silhouette_score, calinski_harabasz_score, davies_bouldin_score,
+)
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import OneHotEncoder
+from spans import span, AJUSTE_MODELO
+
+# ---------------------------------------------
+# Modelos de clustering e regressão, sem dependência do Streamlit
+# ---------------------------------------------
+# Usado pelas páginas k_means.py, random_forest.py e gradient_boosting.py e
+# pelo relatório em lote (batch_report.py).
+
+# Colunas usadas no clustering
+KMEANS_COLUMNS = ['faixa_populacao', 'Valor total dos procedimentos', 'Quantidade total de procedimentos']
+
+# Variáveis e alvo do Random Forest
+RF_FEATURES = ['faixa_populacao', 'Quantidade total de procedimentos']
+RF_TARGET = 'Valor total dos procedimentos'
+
+# Função para calcular as métricas de regressão
+def regression_metrics(y_true, y_pred):
+    mse = mean_squared_error(y_true, y_pred)
+    return {
+        'mae': mean_absolute_error(y_true, y_pred),
+        'mse': mse,
+        'rmse': np.sqrt(mse),
+        'r2': r2_score(y_true, y_pred),
+    }
+
+# Função para agrupar as linhas com K-Means e avaliar os clusters
+def cluster_kmeans(X, n_clusters=3):
+    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init='auto')
+    with span(AJUSTE_MODELO, 'KMeans'):
+        labels = kmeans.fit_predict(X)
+    return labels, {
+        'silhouette': silhouette_score(X, labels),
+        'calinski_harabasz': calinski_harabasz_score(X, labels),
+        'davies_bouldin': davies_bouldin_score(X, labels),
+    }
+
+# Função para treinar um regressor com divisão treino/teste 70/30 e avaliá-lo
+def _train_regressor(model, X, y, nome):
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
+    with span(AJUSTE_MODELO, nome):
+        model.fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+    feature_importances = pd.DataFrame({
+        'Variável': X.columns,
+        'Importância': model.feature_importances_
+    }).sort_values(by='Importância', ascending=False)
+    return {
+        'model': model,
+        'y_test': y_test,
+        'y_pred': y_pred,
+        'feature_importances': feature_importances,
+        'metricas': regression_metrics(y_test, y_pred),
+    }
+
+# Função para treinar o Random Forest do valor total dos procedimentos
+def train_random_forest(df, n_estimators=100):
+    model = RandomForestRegressor(n_estimators=n_estimators, random_state=42)
+    return _train_regressor(model, df[RF_FEATURES], df[RF_TARGET], 'RandomForestRegressor')
+
+# Função para localizar a coluna alvo do Gradient Boosting
+def find_target_column(df):
+    for col in df.columns:
+        if "total" in col.lower() and "procedimentos" in col.lower():
+            return col
+    return None
+
+# Função para codificar as colunas categóricas (one-hot) e manter só as numéricas
+def encode_features(df):
+    categorical_columns = df.select_dtypes(include=['object', 'category']).columns.tolist()
+    if categorical_columns:
+        encoder = OneHotEncoder(sparse_output=False, drop='first')
+        encoded_features = pd.DataFrame(
+            encoder.fit_transform(df[categorical_columns]),
+            columns=encoder.get_feature_names_out(categorical_columns)
+        )
+        df = pd.concat([df.reset_index(drop=True), encoded_features], axis=1).drop(columns=categorical_columns)
+    return df.select_dtypes(include='number')
+
+# Função para treinar o Gradient Boosting sobre as colunas já codificadas
+def train_gradient_boosting(df_numeric, target, n_estimators=100, learning_rate=0.1):
+    X = df_numeric.drop(columns=[target], errors='ignore')
+    y = df_numeric[target]
+    model = GradientBoostingRegressor(n_estimators=n_estimators, learning_rate=learning_rate, random_state=42)
+    return _train_regressor(model, X, y, 'GradientBoostingRegressor')
@@ -0,0 +1,34 @@
+from startup_report import import_page
+
+# Páginas de análise exploratória: módulo -> rótulo do botão
+ANALYSIS_PAGES = {
+    "descriptive_analysis": "📊 Análise Descritiva e Estatística",
+    "visualizacao": "🔍 Visualização de Dados",
+    "cost_analysis": "💰 Análise de Custos",
+    "temporal_analysis": "📅 Análise Temporal e Sazonal",
+    "geographic_distribution": "🗺️ Distribuição Geográfica",
+}
+
+# Páginas de modelagem: módulo -> rótulo do botão
+MODEL_PAGES = {
+    "modelo_serie_temporal": "📅 Modelo de Série Temporal - MST",
+    "k_means": "📊 Método K-Means",
+    "regressao_linear": "📈 Regressão Linear",
+    "gradient_boosting": "💡 Gradient Boosting",
+    "random_forest": "🌲 Random Forest",
+}
+
+PAGES = {**ANALYSIS_PAGES, **MODEL_PAGES}
+
+# Função para obter a função render() de uma página.
+# O módulo é importado (e compilado) só na primeira vez que a página é aberta,
+# junto com as bibliotecas pesadas que ele usa; nas execuções seguintes o
+# Python o reaproveita de sys.modules.
+def get_page(name):
+    if name not in PAGES:
+        raise KeyError(f"Página desconhecida: {name}")
+    return import_page(name).render
+
+# Função para renderizar uma página registrada
+def render_page(name):
+    get_page(name)()
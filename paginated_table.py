@@ -0,0 +1,31 @@
+import math
+import streamlit as st
+
+# Tamanhos de página oferecidos e quantidade de colunas exibidas por padrão
+PAGE_SIZES = [25, 50, 100, 250]
+DEFAULT_VISIBLE_COLUMNS = 12
+
+# Função para exibir um DataFrame paginado. O recorte (página e colunas
+# visíveis) é feito no servidor: só ele é enviado ao navegador, então o
+# tamanho da mensagem não depende da quantidade de linhas filtradas.
+def paginated_dataframe(df, key, default_columns=None):
+    colunas = list(df.columns)
+    padrao = [col for col in (default_columns or colunas[:DEFAULT_VISIBLE_COLUMNS]) if col in colunas]
+    visiveis = st.multiselect("Colunas exibidas:", colunas, default=padrao, key=f"{key}_colunas")
+
+    col_tamanho, col_pagina, col_info = st.columns([1, 1, 2])
+    tamanho = col_tamanho.selectbox("Linhas por página:", PAGE_SIZES, index=1, key=f"{key}_tamanho")
+    total = len(df)
+    paginas = max(1, math.ceil(total / tamanho))
+
+    chave_pagina = f"{key}_pagina"
+    # O valor inicial fica só no session_state (sem value=), e volta para a
+    # primeira página quando os filtros reduzem o número de páginas
+    if st.session_state.get(chave_pagina, 1) > paginas or chave_pagina not in st.session_state:
+        st.session_state[chave_pagina] = 1
+    pagina = col_pagina.number_input("Página:", min_value=1, max_value=paginas, step=1, key=chave_pagina)
+
+    inicio = (pagina - 1) * tamanho
+    fim = min(inicio + tamanho, total)
+    col_info.caption(f"Linhas {inicio + 1 if total else 0}–{fim} de {total} · página {pagina} de {paginas}")
+    st.dataframe(df.iloc[inicio:fim][visiveis or padrao])
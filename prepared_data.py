@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from data_processing import (
+    load_data, load_filter_options, data_watermark, has_local_source, as_list, TODOS,
+)
+from spans import span, CARGA, PREPROCESSAMENTO
+
+# Recortes e colunas derivados do conjunto compartilhado dependem do
+# Copy-on-Write, padrão a partir do pandas 3 (ver requirements.txt): só são
+# copiados quando alterados, então nenhuma página consegue modificar o cache
+# e nenhuma precisa fazer df.copy() antes de filtrar.
+
+# Colunas numéricas auxiliares usadas pelas páginas de modelagem e mapas
+AUXILIARY_NUMERIC_COLUMNS = ['faixa_populacao', 'latitude', 'longitude']
+
+# Função com o pré-processamento canônico, comum a todas as páginas
+def prepare_data(df):
+    # Remover colunas duplicadas
+    df = df.loc[:, ~df.columns.duplicated()]
+
+    # Garantir que a coluna 'ano_aih' seja numérica e válida
+    df['ano_aih'] = pd.to_numeric(df['ano_aih'], errors='coerce')
+    df = df[df['ano_aih'].notna()]  # Remove valores NaN
+    df['ano_aih'] = df['ano_aih'].astype('int16')  # Converte para inteiro
+
+    # Mês como inteiro pequeno
+    if 'mes_aih' in df.columns:
+        df['mes_aih'] = pd.to_numeric(df['mes_aih'], errors='coerce').fillna(0).astype('int8')
+
+    # Garantir que as colunas auxiliares sejam numéricas
+    for col in AUXILIARY_NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+    return df.reset_index(drop=True)
+
+# Função para preparar o conjunto de dados de uma marca d'água da origem.
+# Só a versão mais recente fica em memória; quando a origem muda, a próxima
+# chamada recarrega. load_data é chamada sem o cache de resultados para não
+# manter duas cópias da tabela inteira.
+@st.cache_resource(show_spinner="Carregando dados...", max_entries=1)
+def get_prepared_version(watermark):
+    with span(CARGA, 'get_prepared_data'):
+        df = load_data.__wrapped__()
+    with span(PREPROCESSAMENTO, 'prepare_data'):
+        return prepare_data(df)
+
+# Função para obter o conjunto de dados preparado, compartilhado por todas as
+# páginas e sessões do processo
+def get_prepared_data():
+    return get_prepared_version(data_watermark())
+
+# Dimensões do índice de filtros, na ordem em que são escolhidas na barra lateral
+INDEX_DIMENSIONS = ['uf_nome', 'nome_municipio', 'ano_aih']
+
+# Função para normalizar chaves ausentes (NaN) em None
+def _key(value):
+    return None if pd.isna(value) else value
+
+# Função para construir o índice hierárquico estado → município → ano.
+# Cada folha guarda as posições (inteiras, em ordem) das linhas do conjunto
+# preparado; as listas de opções dos filtros ficam pré-ordenadas.
+def build_filter_index(df):
+    tree = {}
+    municipios = {None: set()}
+    anos = {(None, None): set()}
+    grupos = df.groupby(INDEX_DIMENSIONS, observed=True, sort=False, dropna=False).indices
+    for (uf, municipio, ano), posicoes in grupos.items():
+        uf, municipio, ano = _key(uf), _key(municipio), int(ano)
+        tree.setdefault(uf, {}).setdefault(municipio, {})[ano] = posicoes
+        if uf is None or municipio is None:
+            continue
+        municipios[None].add(municipio)
+        municipios.setdefault(uf, set()).add(municipio)
+        for chave in ((None, None), (uf, None), (None, municipio), (uf, municipio)):
+            anos.setdefault(chave, set()).add(ano)
+
+    return {
+        'tree': tree,
+        'estados': sorted(uf for uf in tree if uf is not None),
+        'municipios': {uf: sorted(valores) for uf, valores in municipios.items()},
+        'anos': {chave: sorted(valores) for chave, valores in anos.items()},
+    }
+
+# Função para obter o índice de filtros do conjunto preparado
+def get_filter_index():
+    return _filter_index(data_watermark())
+
+@st.cache_resource(max_entries=1)
+def _filter_index(watermark):
+    df = get_prepared_version(watermark)
+    with span(PREPROCESSAMENTO, 'build_filter_index'):
+        return build_filter_index(df)
+
+# Função para obter o índice usado pelas listas de opções. Sem tabela local,
+# ele é montado só com as combinações distintas consultadas no banco, sem
+# carregar o conjunto inteiro.
+def _option_index():
+    if has_local_source():
+        return get_filter_index()
+    return _remote_option_index(data_watermark())
+
+@st.cache_resource(max_entries=1)
+def _remote_option_index(watermark):
+    return build_filter_index(load_filter_options())
+
+# Funções para obter as opções ordenadas de cada filtro ('Todos' = sem restrição)
+def opcoes_estados():
+    return _option_index()['estados']
+
+def opcoes_municipios(uf=None):
+    uf = None if uf == TODOS else uf
+    return _option_index()['municipios'].get(uf, [])
+
+def opcoes_anos(uf=None, municipio=None):
+    uf = None if uf == TODOS else uf
+    municipio = None if municipio == TODOS else municipio
+    return _option_index()['anos'].get((uf, municipio), [])
+
+# Função para obter as posições das linhas que atendem aos filtros, ou None
+# quando nenhum filtro é aplicado. Percorre apenas os ramos selecionados.
+def filter_positions(uf=None, municipio=None, anos=None, index=None):
+    ufs, municipios, anos = as_list(uf), as_list(municipio), as_list(anos)
+    if ufs is None and municipios is None and anos is None:
+        return None
+    anos = None if anos is None else [int(ano) for ano in anos]
+
+    tree = (get_filter_index() if index is None else index)['tree']
+    partes = []
+    for ramo_uf in (tree.values() if ufs is None else (tree[u] for u in ufs if u in tree)):
+        for ramo_mun in (ramo_uf.values() if municipios is None else (ramo_uf[m] for m in municipios if m in ramo_uf)):
+            if anos is None:
+                partes.extend(ramo_mun.values())
+            else:
+                partes.extend(ramo_mun[a] for a in anos if a in ramo_mun)
+    if not partes:
+        return np.empty(0, dtype=np.intp)
+    # Manter a ordem original das linhas
+    return np.sort(np.concatenate(partes))
+
+# Função para obter um recorte somente leitura do conjunto preparado.
+# Mesmos parâmetros de load_data; None ou 'Todos' significa "sem filtro".
+# Sem tabela local, recortes com colunas ou filtros são consultados no banco
+# por load_data, cujo cache guarda os resultados de cada marca d'água.
+def get_view(columns=None, uf=None, municipio=None, anos=None):
+    filtrado = any(as_list(valor) is not None for valor in (uf, municipio, anos))
+    if not has_local_source() and (columns is not None or filtrado):
+        return _remote_view(columns, uf, municipio, anos)
+
+    # Conjunto e índice da mesma versão dos dados
+    watermark = data_watermark()
+    df = get_prepared_version(watermark)
+    if columns is not None:
+        df = df[list(columns)]
+    posicoes = filter_positions(uf, municipio, anos, index=_filter_index(watermark))
+    if posicoes is not None:
+        return df.take(posicoes)
+    # Novo objeto (cópia preguiçosa), para que colunas adicionadas pela página
+    # não apareçam no conjunto compartilhado
+    return df.copy(deep=False)
+
+# Função para consultar um recorte no banco e aplicar o mesmo pré-processamento
+# do conjunto completo (que precisa de 'ano_aih')
+def _remote_view(columns, uf, municipio, anos):
+    colunas = None if columns is None else list(dict.fromkeys(list(columns) + ['ano_aih']))
+    df = prepare_data(load_data(columns=colunas, uf=uf, municipio=municipio, anos=anos))
+    return df if columns is None else df[list(columns)]
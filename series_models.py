@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.arima.model import ARIMA
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+from sklearn.metrics import mean_absolute_error, mean_squared_error
+from spans import span, AJUSTE_MODELO
+
+# ---------------------------------------------
+# Séries anuais e modelos ARIMA/SARIMA, sem dependência do Streamlit
+# ---------------------------------------------
+# Usado pela página modelo_serie_temporal.py e pelo relatório em lote
+# (batch_report.py).
+
+VALOR_TOTAL = 'Valor total dos procedimentos'
+QUANTIDADE_TOTAL = 'Quantidade total de procedimentos'
+
+# Anos considerados, último ano de treino e anos previstos
+ANOS_RELEVANTES = list(range(2019, 2026))
+ULTIMO_ANO_TREINO = 2023
+ANOS_PREVISAO = [2024, 2025]
+
+# Funções de Métricas de Avaliação
+def calculate_rmse(actual, predicted):
+    return np.sqrt(mean_squared_error(actual, predicted))
+
+def calculate_mape(actual, predicted):
+    actual, predicted = np.array(actual), np.array(predicted)
+    mask = actual != 0  # Evitar divisões por zero
+    return np.mean(np.abs((actual[mask] - predicted[mask]) / actual[mask])) * 100 if mask.any() else float('inf')
+
+def calculate_accuracy(actual, predicted):
+    actual, predicted = np.array(actual), np.array(predicted)
+    mask = actual != 0
+    return 100 - calculate_mape(actual, predicted) if mask.any() else float('inf')
+
+# Função para somar custos e quantidades por ano
+def annual_totals(df):
+    df = df[df['ano_aih'].isin(ANOS_RELEVANTES)]
+    return df.groupby('ano_aih').agg({
+        VALOR_TOTAL: 'sum',
+        QUANTIDADE_TOTAL: 'sum'
+    }).reset_index()
+
+# Função para separar o treino (até ULTIMO_ANO_TREINO) e o período previsto,
+# ambos indexados por data
+def split_train_test(df_grouped):
+    train = df_grouped[df_grouped['ano_aih'] <= ULTIMO_ANO_TREINO].copy()
+    train['ano_aih'] = pd.to_datetime(train['ano_aih'], format='%Y')
+    train.set_index('ano_aih', inplace=True)
+
+    test = pd.DataFrame({'ano_aih': ANOS_PREVISAO})
+    test['ano_aih'] = pd.to_datetime(test['ano_aih'], format='%Y')
+    test.set_index('ano_aih', inplace=True)
+    return train, test
+
+# Função para ajustar ARIMA(1,1,1) ou SARIMA(1,1,1)(1,1,1,12) a uma série e
+# prever `steps` períodos. Retorna a previsão e as métricas de treino.
+def forecast_series(serie, modelo='ARIMA', steps=len(ANOS_PREVISAO)):
+    if modelo == 'ARIMA':
+        model = ARIMA(serie, order=(1, 1, 1))
+        fit_kwargs = {}
+    elif modelo == 'SARIMA':
+        model = SARIMAX(
+            serie,
+            order=(1, 1, 1),  # p, d, q
+            seasonal_order=(1, 1, 1, 12),  # P, D, Q, m (m=12 meses, sazonalidade anual)
+            enforce_stationarity=False,
+            enforce_invertibility=False
+        )
+        fit_kwargs = {'disp': False}
+    else:
+        raise ValueError(f"Modelo não suportado: {modelo}")
+
+    with span(AJUSTE_MODELO, f"{modelo} {serie.name}"):
+        result = model.fit(**fit_kwargs)
+
+    previsto_treino = result.predict(start=serie.index[0], end=serie.index[-1])
+    return {
+        'previsao': result.forecast(steps=steps).values,
+        'previsto_treino': previsto_treino,
+        'mae': mean_absolute_error(serie, previsto_treino),
+        'rmse': calculate_rmse(serie, previsto_treino),
+        'mape': calculate_mape(serie, previsto_treino),
+        'acuracia': calculate_accuracy(serie, previsto_treino),
+    }
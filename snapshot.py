@@ -0,0 +1,163 @@
+import os
+import re
+import time
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+
+# Caminho do snapshot local (formato Arrow IPC, sem compressão, para permitir
+# leitura mapeada em memória)
+SNAPSHOT_PATH = os.environ.get(
+    'TCC_SNAPSHOT_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'saude_ride_tcc_luis.arrow')
+)
+
+# Função para ler um arquivo Arrow IPC mapeado em memória
+def read_arrow(path):
+    # As colunas apontam direto para o arquivo mapeado: nada é copiado para a
+    # memória até que o pandas converta a tabela
+    with pa.memory_map(path, 'r') as source:
+        return ipc.open_file(source).read_all()
+
+# Cada gravação do snapshot cria um arquivo novo com a versão no nome
+# (nome.<versão>.arrow). Um arquivo mapeado em memória não pode ser substituído
+# no Windows; assim, as tabelas ainda abertas continuam válidas e a leitura
+# passa para a versão mais recente.
+
+# Função para listar as versões do snapshot, da mais antiga para a mais recente.
+# O arquivo sem versão (formato anterior) conta como versão 0.
+def snapshot_versions(path=SNAPSHOT_PATH):
+    pasta, nome = os.path.split(os.path.abspath(path))
+    base, extensao = os.path.splitext(nome)
+    padrao = re.compile(re.escape(base) + r'\.(\d+)' + re.escape(extensao) + '$')
+    versoes = []
+    if os.path.isdir(pasta):
+        for arquivo in os.listdir(pasta):
+            encontrado = padrao.match(arquivo)
+            if encontrado:
+                versoes.append((int(encontrado.group(1)), os.path.join(pasta, arquivo)))
+    if os.path.exists(path):
+        versoes.append((0, path))
+    return [caminho for _, caminho in sorted(versoes)]
+
+# Função para obter o caminho da versão atual do snapshot (None se não existir)
+def current_snapshot(path=SNAPSHOT_PATH):
+    versoes = snapshot_versions(path)
+    return versoes[-1] if versoes else None
+
+# Função para ler o snapshot mapeado em memória (retorna None se não existir)
+def read_snapshot(path=SNAPSHOT_PATH):
+    atual = current_snapshot(path)
+    return None if atual is None else read_arrow(atual)
+
+# Função para gravar uma nova versão do snapshot (arquivo temporário + troca
+# para um nome que ainda não existe) e apagar as versões anteriores. Versões
+# ainda mapeadas por alguma tabela não podem ser apagadas no Windows; ficam
+# para a próxima gravação.
+def write_snapshot(table, path=SNAPSHOT_PATH):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    anteriores = snapshot_versions(path)
+    base, extensao = os.path.splitext(path)
+    novo = f"{base}.{time.time_ns()}{extensao}"
+    tmp_path = novo + '.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, novo)
+    for antigo in anteriores:
+        try:
+            os.remove(antigo)
+        except OSError:
+            pass
+    return novo
+
+# Função para marcar o snapshot como verificado sem regravá-lo
+def touch_snapshot(path=SNAPSHOT_PATH):
+    os.utime(current_snapshot(path))
+
+# Função para calcular há quantos segundos o snapshot foi verificado
+def snapshot_age(path=SNAPSHOT_PATH):
+    return time.time() - os.path.getmtime(current_snapshot(path))
+
+# Função para calcular a chave de período (ano * 100 + mês) de cada linha
+def period_key(table):
+    ano = pc.cast(table['ano_aih'], pa.int64(), safe=False)
+    mes = pc.cast(table['mes_aih'], pa.int64(), safe=False)
+    return pc.add(pc.multiply(ano, 100), mes)
+
+# Função para obter o maior (ano_aih, mes_aih) armazenado no snapshot
+def max_period(table):
+    if table is None or table.num_rows == 0:
+        return None
+    maior = pc.max(period_key(table)).as_py()
+    if maior is None:
+        return None
+    return divmod(maior, 100)
+
+# Função para incorporar as linhas novas ao snapshot.
+# As linhas do último período armazenado são substituídas pelas recebidas,
+# pois um mês pode ter sido carregado parcialmente na atualização anterior.
+def merge_snapshot(table, new_rows, period):
+    ano, mes = period
+    manter = pc.less(period_key(table), ano * 100 + mes)
+    antigas = table.filter(pc.fill_null(manter, True))
+    novas = new_rows.select(table.schema.names).cast(table.schema)
+    return pa.concat_tables([antigas, novas]).combine_chunks()
+
+# Função para aplicar filtros e projeção de colunas sobre uma tabela local.
+# Os filtros recebem listas de valores; None significa "sem filtro".
+def query_table(table, columns=None, uf=None, municipio=None, anos=None):
+    mask = None
+    for column, values in (('uf_nome', uf), ('nome_municipio', municipio)):
+        if values is not None:
+            cond = pc.is_in(table[column], value_set=pa.array(values, table[column].type))
+            mask = cond if mask is None else pc.and_(mask, cond)
+    if anos is not None:
+        ano = pc.cast(table['ano_aih'], pa.int64(), safe=False)
+        cond = pc.is_in(ano, value_set=pa.array(anos, pa.int64()))
+        mask = cond if mask is None else pc.and_(mask, cond)
+
+    if mask is not None:
+        table = table.filter(pc.fill_null(mask, False))
+    if columns is not None:
+        table = table.select(columns)
+    return table
+
+# Função para listar as combinações distintas de estado, município e ano
+def distinct_filters(table):
+    ano = pc.cast(table['ano_aih'], pa.int64(), safe=False)
+    dims = pa.table({
+        'uf_nome': table['uf_nome'],
+        'nome_municipio': table['nome_municipio'],
+        'ano_aih': ano,
+    })
+    return dims.group_by(['uf_nome', 'nome_municipio', 'ano_aih']).aggregate([])
+
+# Função para agregar medidas (média ou soma) agrupando pelas dimensões em `by`.
+# Valores nulos contam como 0 e linhas sem ano são descartadas, como nas páginas.
+def aggregate_table(table, measures, by=(), agg='mean'):
+    table = table.filter(pc.is_valid(table['ano_aih']))
+    columns = {}
+    for dim in by:
+        col = table[dim]
+        if dim in ('ano_aih', 'mes_aih'):
+            col = pc.cast(col, pa.int64(), safe=False)
+        columns[dim] = col
+    for measure in measures:
+        columns[measure] = pc.fill_null(pc.cast(table[measure], pa.float64(), safe=False), 0)
+    data = pa.table(columns)
+
+    if not by:
+        func = pc.mean if agg == 'mean' else pc.sum
+        result = {measure: [func(data[measure]).as_py()] for measure in measures}
+        result['n_linhas'] = [data.num_rows]
+        return pa.table(result)
+
+    data = data.append_column('n_linhas', pa.array([1] * data.num_rows, pa.int64()))
+    grouped = data.group_by(list(by)).aggregate(
+        [(measure, agg) for measure in measures] + [('n_linhas', 'sum')]
+    )
+    result = {dim: grouped[dim] for dim in by}
+    result.update({measure: grouped[f"{measure}_{agg}"] for measure in measures})
+    result['n_linhas'] = grouped['n_linhas_sum']
+    return pa.table(result).sort_by([(dim, 'ascending') for dim in by])
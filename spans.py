@@ -0,0 +1,99 @@
+import collections
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Etapas medidas pelas páginas e pela camada de dados
+CARGA = 'carga'
+PREPROCESSAMENTO = 'preprocessamento'
+AJUSTE_MODELO = 'ajuste_modelo'
+RENDERIZACAO = 'renderizacao'
+
+# Painel de desempenho na barra lateral (TCC_PERF_PANEL=0 para ocultar)
+PAINEL_DESEMPENHO = os.environ.get('TCC_PERF_PANEL', '1') != '0'
+
+# Medição de alocações com tracemalloc: tem custo, então só é ligada quando
+# TCC_SPANS_TRACEMALLOC=1
+if os.environ.get('TCC_SPANS_TRACEMALLOC') == '1' and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+# Medições do processo, consumidas pelo benchmark (limitadas para não crescer
+# indefinidamente quando ninguém as coleta)
+_spans = collections.deque(maxlen=10000)
+_lock = threading.Lock()
+
+# Estado da execução atual: cada rerun do Streamlit roda em sua própria
+# thread, então a pilha de spans e as medições do rerun ficam na thread
+_local = threading.local()
+
+# Função para iniciar a coleta de um novo rerun (chamada no início do home.py)
+def start_run():
+    _local.run = []
+    _local.stack = []
+
+# Função para obter as medições do rerun atual, na ordem em que terminaram
+def run_spans():
+    return list(getattr(_local, 'run', []))
+
+# Função para ler a memória alocada pelo Python, em bytes (None sem tracemalloc)
+def _allocated():
+    return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+
+# Função para medir um trecho de código:
+#     with span(AJUSTE_MODELO, 'KMeans'):
+#         model.fit(X)
+# Registra tempo total, tempo de CPU da thread, variação de memória alocada e
+# o tempo próprio (sem os spans internos), usado para somar as etapas sem
+# contar duas vezes trechos aninhados.
+@contextmanager
+def span(etapa, detalhe=None):
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    frame = {'filhos_s': 0.0}
+    stack.append(frame)
+    alocado = _allocated()
+    cpu = time.thread_time()
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - inicio
+        cpu = time.thread_time() - cpu
+        stack.pop()
+        if stack:
+            stack[-1]['filhos_s'] += wall
+        registro = {
+            'etapa': etapa,
+            'detalhe': detalhe,
+            'nivel': len(stack),
+            'tempo_s': round(wall, 6),
+            'proprio_s': round(wall - frame['filhos_s'], 6),
+            'cpu_s': round(cpu, 6),
+            'alocado_mb': None if alocado is None else round((_allocated() - alocado) / 2**20, 3),
+        }
+        with _lock:
+            _spans.append(registro)
+        if hasattr(_local, 'run'):
+            _local.run.append(registro)
+        logger.info(json.dumps({'span': registro}, ensure_ascii=False))
+
+# Função para obter as medições registradas no processo e limpar a lista
+def collect_spans():
+    with _lock:
+        spans = list(_spans)
+        _spans.clear()
+    return spans
+
+# Função para somar o tempo próprio de cada etapa
+def stage_totals(spans):
+    totais = {}
+    for item in spans:
+        totais[item['etapa']] = totais.get(item['etapa'], 0.0) + item['proprio_s']
+    return totais
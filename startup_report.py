@@ -0,0 +1,63 @@
+import ast
+import importlib
+import importlib.util
+import logging
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+# Tempos de importação registrados no processo: módulo -> dados da medição
+_import_times = {}
+
+# Função para importar um módulo medindo o tempo gasto.
+# Só a primeira importação é medida; depois o módulo já está em sys.modules.
+def timed_import(name, requested_by=None):
+    if name in sys.modules:
+        return sys.modules[name]
+    inicio = time.perf_counter()
+    module = importlib.import_module(name)
+    segundos = time.perf_counter() - inicio
+    _import_times[name] = {
+        'modulo': name,
+        'solicitado_por': requested_by or name,
+        'tempo_ms': round(segundos * 1000, 1),
+    }
+    logger.info("Importação de %s: %.1f ms", name, segundos * 1000)
+    return module
+
+# Função para listar os módulos importados no nível superior de um arquivo,
+# sem executá-lo
+def top_level_imports(name):
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.origin is None:
+        return []
+    with open(spec.origin, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+# Função para importar uma página medindo separadamente cada biblioteca que
+# ela usa; o custo de uma biblioteca fica com a primeira página que a carrega
+def import_page(name):
+    if name not in sys.modules:
+        for dependency in top_level_imports(name):
+            timed_import(dependency, requested_by=name)
+    return timed_import(name, requested_by=name)
+
+# Função para registrar uma medição avulsa (por exemplo, o primeiro desenho da home)
+def record(name, segundos):
+    _import_times[name] = {
+        'modulo': name,
+        'solicitado_por': name,
+        'tempo_ms': round(segundos * 1000, 1),
+    }
+
+# Função para obter o relatório, do mais lento para o mais rápido
+def import_report():
+    return sorted(_import_times.values(), key=lambda item: item['tempo_ms'], reverse=True)
@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from data_processing import data_watermark, as_list
+from prepared_data import get_prepared_version
+from spans import span, PREPROCESSAMENTO
+
+# ---------------------------------------------
+# Estatísticas descritivas a partir de resumos combináveis
+# ---------------------------------------------
+# Para cada partição (uf_nome, nome_municipio, ano_aih) e cada coluna numérica
+# são guardados:
+#   - momentos de Welford (contagem, média, M2, mínimo e máximo), combinados
+#     pela fórmula de Chan;
+#   - um resumo de quantis no estilo t-digest: até COMPRESSION centroides
+#     (média e peso) por partição, obtidos dividindo os valores ordenados em
+#     faixas de mesma contagem. Partições pequenas guardam os próprios valores,
+#     e aí os quantis são exatos.
+# Qualquer combinação de filtros é descrita combinando os resumos das
+# partições selecionadas, sem percorrer as linhas.
+
+PARTITION_KEYS = ['uf_nome', 'nome_municipio', 'ano_aih']
+COMPRESSION = 100
+PERCENTIS = [0.25, 0.5, 0.75]
+
+# Função para construir os centroides de uma coluna, para todas as partições
+# de uma vez: ordena por (partição, valor) e agrupa os postos em faixas
+def _column_centroids(valores, ids, n_particoes, compression):
+    validos = ~np.isnan(valores)
+    valores, ids = valores[validos], ids[validos]
+    ordem = np.lexsort((valores, ids))
+    valores, ids = valores[ordem], ids[ordem]
+
+    tamanhos = np.bincount(ids, minlength=n_particoes)
+    inicios = np.concatenate(([0], np.cumsum(tamanhos)[:-1]))
+    posto = np.arange(len(valores)) - inicios[ids]
+    n = tamanhos[ids]
+    faixa = np.where(n <= compression, posto, posto * compression // np.maximum(n, 1))
+
+    chave = ids.astype(np.int64) * compression + faixa
+    chaves, centroide = np.unique(chave, return_inverse=True)
+    pesos = np.bincount(centroide)
+    medias = np.bincount(centroide, weights=valores) / pesos
+    return {'particao': (chaves // compression).astype(np.int32), 'media': medias, 'peso': pesos}
+
+# Função para construir os resumos de todas as partições
+def build_sketches(df, columns=None, compression=COMPRESSION):
+    if columns is None:
+        columns = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
+    grupos = df.groupby(PARTITION_KEYS, observed=True, sort=True, dropna=False)
+    medidas = grupos[columns]
+    contagem = medidas.count()
+    momentos = {
+        'n': contagem.to_numpy(np.float64),
+        'media': medidas.mean().to_numpy(np.float64),
+        'm2': (medidas.var(ddof=0) * contagem).fillna(0).to_numpy(np.float64),
+        'min': medidas.min().to_numpy(np.float64),
+        'max': medidas.max().to_numpy(np.float64),
+    }
+
+    ids = grupos.ngroup().to_numpy()
+    n_particoes = len(contagem)
+    centroides = {
+        col: _column_centroids(df[col].to_numpy(np.float64), ids, n_particoes, compression)
+        for col in columns
+    }
+    return {
+        'columns': list(columns),
+        'keys': contagem.index.to_frame(index=False),
+        'moments': momentos,
+        'centroids': centroides,
+    }
+
+# Função para obter os resumos do conjunto preparado (um por versão dos dados)
+def get_sketches():
+    return _sketches(data_watermark())
+
+@st.cache_resource(show_spinner="Calculando resumos estatísticos...", max_entries=1)
+def _sketches(watermark):
+    df = get_prepared_version(watermark)
+    with span(PREPROCESSAMENTO, 'build_sketches'):
+        return build_sketches(df)
+
+# Função para calcular um quantil a partir de centroides (média, peso).
+# Com pesos 1 o resultado é igual à interpolação linear do pandas.
+def _quantiles(medias, pesos, percentis):
+    if len(medias) == 0:
+        return [np.nan] * len(percentis)
+    ordem = np.argsort(medias, kind='stable')
+    medias, pesos = medias[ordem], pesos[ordem]
+    acumulado = np.cumsum(pesos)
+    centros = acumulado - pesos / 2 - 0.5
+    total = acumulado[-1]
+    return np.interp([q * (total - 1) for q in percentis], centros, medias)
+
+# Função equivalente a df.describe() para o recorte definido pelos filtros,
+# combinando os resumos das partições selecionadas
+def describe_view(uf=None, municipio=None, anos=None, columns=None, sketches=None):
+    sketches = get_sketches() if sketches is None else sketches
+    keys = sketches['keys']
+    selecao = np.ones(len(keys), dtype=bool)
+    for col, valores in (('uf_nome', as_list(uf)), ('nome_municipio', as_list(municipio)), ('ano_aih', as_list(anos))):
+        if valores is not None:
+            if col == 'ano_aih':
+                valores = [int(v) for v in valores]
+            selecao &= keys[col].isin(valores).to_numpy()
+
+    todas = sketches['columns']
+    columns = todas if columns is None else [col for col in columns if col in todas]
+    idx = [todas.index(col) for col in columns]
+    m = {nome: valores[selecao][:, idx] for nome, valores in sketches['moments'].items()}
+
+    # Combinação dos momentos (Chan et al.)
+    n = m['n'].sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = np.nansum(m['n'] * np.nan_to_num(m['media']), axis=0) / n
+        m2 = m['m2'].sum(axis=0) + np.nansum(m['n'] * (np.nan_to_num(m['media']) - media) ** 2, axis=0)
+        desvio = np.where(n > 1, np.sqrt(m2 / (n - 1)), np.nan)
+    minimo = np.nanmin(np.where(m['n'] > 0, m['min'], np.inf), axis=0, initial=np.inf)
+    maximo = np.nanmax(np.where(m['n'] > 0, m['max'], -np.inf), axis=0, initial=-np.inf)
+
+    selecionadas = np.flatnonzero(selecao)
+    quantis = []
+    for col in columns:
+        cent = sketches['centroids'][col]
+        mascara = np.isin(cent['particao'], selecionadas)
+        quantis.append(_quantiles(cent['media'][mascara], cent['peso'][mascara], PERCENTIS))
+    quantis = np.array(quantis).reshape(len(columns), len(PERCENTIS)).T
+
+    vazio = n == 0
+    linhas = [n, media, desvio, np.where(vazio, np.nan, minimo)]
+    linhas += list(quantis)
+    linhas.append(np.where(vazio, np.nan, maximo))
+    indice = ['count', 'mean', 'std', 'min'] + [f"{q:.0%}" for q in PERCENTIS] + ['max']
+    return pd.DataFrame(np.vstack(linhas), index=indice, columns=columns)
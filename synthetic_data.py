@@ -0,0 +1,163 @@
+import argparse
+import os
+import numpy as np
+import pyarrow as pa
+from data_processing import (
+    rename_mapping, TABLE_NAME, DB_CONFIG, run_async, get_pool, close_pool,
+)
+
+# ---------------------------------------------
+# Gerador de dados sintéticos de saude_ride_tcc_luis
+# ---------------------------------------------
+# Produz linhas município × ano × mês com o mesmo conjunto de colunas da
+# tabela real, para reproduzir problemas de desempenho sem acesso ao banco e
+# testar o painel com 10x–1000x linhas.
+
+# Estados da RIDE-DF e participação de cada um no número de municípios
+ESTADOS = {'Distrito Federal': 0.05, 'Goiás': 0.75, 'Minas Gerais': 0.20}
+
+# Centro aproximado da RIDE-DF (latitude, longitude)
+CENTRO = (-15.79, -47.88)
+
+# Sazonalidade mensal dos atendimentos (multiplicador por mês, jan..dez)
+SAZONALIDADE = np.array([0.92, 0.90, 1.00, 1.02, 1.05, 1.04, 1.06, 1.07, 1.03, 1.00, 0.97, 0.94])
+
+# Colunas de medidas (nomes originais), sem as duplicatas em maiúsculas
+QTD_COLUMNS = [col for col in rename_mapping if col.startswith('qtd_') and col != 'qtd_total']
+VL_COLUMNS = [col for col in rename_mapping if col.startswith('vl_') and len(col) == 7]
+VL_GROUPS = [col for col in rename_mapping if col.startswith('vl_') and len(col) == 5]
+
+# Função para sortear os municípios: estado, nome, coordenadas e população
+def _municipios(n, rng):
+    ufs = rng.choice(list(ESTADOS), size=n, p=list(ESTADOS.values()))
+    ufs[0] = 'Distrito Federal'
+    nomes = np.array([f"Município {i:04d}" for i in range(n)], dtype=object)
+    nomes[0] = 'Brasília'
+    latitude = CENTRO[0] + rng.normal(0, 1.2, n)
+    longitude = CENTRO[1] + rng.normal(0, 1.5, n)
+    # Populações com cauda longa: poucos municípios grandes, muitos pequenos
+    populacao = rng.lognormal(mean=9.5, sigma=1.1, size=n)
+    populacao[0] = 3_000_000
+    faixa = np.digitize(populacao, [5_000, 10_000, 20_000, 50_000, 100_000, 500_000]) + 1
+    return ufs, nomes, latitude, longitude, populacao, faixa
+
+# Função para gerar a tabela sintética em formato Arrow.
+# `anos` é uma sequência de anos; `meses` é a quantidade de meses por ano.
+def generate_table(municipios=50, anos=range(2019, 2025), meses=12, seed=42):
+    rng = np.random.default_rng(seed)
+    anos = np.asarray(list(anos), dtype=np.int32)
+    ufs, nomes, latitude, longitude, populacao, faixa = _municipios(municipios, rng)
+
+    # Uma linha por município × ano × mês
+    idx_mun = np.repeat(np.arange(municipios), len(anos) * meses)
+    ano = np.tile(np.repeat(anos, meses), municipios)
+    mes = np.tile(np.arange(1, meses + 1, dtype=np.int32), municipios * len(anos))
+    n = len(idx_mun)
+
+    # Volume esperado da linha: população, sazonalidade e tendência anual leve
+    tendencia = 1.0 + 0.03 * (ano - anos.min())
+    escala = populacao[idx_mun] / 1_000 * SAZONALIDADE[mes - 1] * tendencia
+
+    columns = {
+        'uf_nome': pa.array(ufs[idx_mun], pa.string()),
+        'nome_municipio': pa.array(nomes[idx_mun], pa.string()),
+        'ano_aih': pa.array(ano, pa.int32()),
+        'mes_aih': pa.array(mes, pa.int32()),
+        'latitude': pa.array(latitude[idx_mun]),
+        'longitude': pa.array(longitude[idx_mun]),
+        'faixa_populacao': pa.array(faixa[idx_mun].astype(np.int32)),
+    }
+
+    # Quantidades: Poisson com taxa por procedimento e muitos zeros nos
+    # procedimentos raros (transplantes, medicina nuclear etc.)
+    quantidades = {}
+    for col in QTD_COLUMNS:
+        taxa = rng.lognormal(mean=-1.0, sigma=1.5)
+        ocorre = rng.random(n) < min(1.0, 0.05 + taxa)
+        quantidades[col] = rng.poisson(escala * taxa) * ocorre
+        columns[col] = pa.array(quantidades[col].astype(np.int64))
+    columns['qtd_total'] = pa.array(sum(quantidades.values()).astype(np.int64))
+
+    # Valores: quantidade × custo unitário com ruído; totais por grupo somam
+    # os subgrupos (vl_02 = vl_0201 + ... + vl_0214) e vl_total soma os grupos
+    grupos = {grupo: np.zeros(n) for grupo in VL_GROUPS}
+    for col in VL_COLUMNS:
+        custo = rng.lognormal(mean=3.5, sigma=1.2)
+        qtd = quantidades.get('qtd_' + col[3:])
+        if qtd is None:
+            qtd = rng.poisson(escala * 0.1)
+        valor = np.round(qtd * custo * rng.lognormal(0, 0.1, n), 2)
+        grupos['vl_' + col[3:5]] += valor
+        columns[col] = pa.array(valor)
+    for grupo, valor in grupos.items():
+        columns[grupo] = pa.array(np.round(valor, 2))
+    columns['vl_total'] = pa.array(np.round(sum(grupos.values()), 2))
+
+    # Mesma ordem de colunas do mapeamento de renomeação
+    ordem = list(columns)[:7] + [col for col in rename_mapping if col in columns]
+    return pa.table({col: columns[col] for col in ordem})
+
+# Função para criar e preencher a tabela em um Postgres local
+async def load_into_postgres(table, table_name=TABLE_NAME):
+    definicoes = []
+    for field in table.schema:
+        if field.name.startswith('qtd_'):
+            tipo = 'bigint'
+        elif pa.types.is_integer(field.type):
+            tipo = 'integer'
+        elif pa.types.is_floating(field.type):
+            tipo = 'double precision'
+        else:
+            tipo = 'text'
+        definicoes.append(f'"{field.name}" {tipo}')
+
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        await conn.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+        await conn.execute(f'CREATE TABLE "{table_name}" ({", ".join(definicoes)})')
+        for batch in table.to_batches(max_chunksize=50_000):
+            registros = zip(*(coluna.to_pylist() for coluna in batch.columns))
+            await conn.copy_records_to_table(table_name, records=registros, columns=table.column_names)
+
+# Função para gravar a tabela em arquivo (.arrow, .parquet ou .csv)
+def write_table(table, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        pq.write_table(table, path)
+    elif path.endswith('.csv'):
+        import pyarrow.csv as csv
+        csv.write_csv(table, path)
+    else:
+        import pyarrow.ipc as ipc
+        with pa.OSFile(path, 'wb') as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+# Função para interpretar anos no formato "2019-2024" ou "2019,2021"
+def parse_anos(texto):
+    if '-' in texto:
+        inicio, fim = texto.split('-')
+        return range(int(inicio), int(fim) + 1)
+    return [int(ano) for ano in texto.split(',')]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos de saude_ride_tcc_luis.")
+    parser.add_argument('--municipios', type=int, default=50)
+    parser.add_argument('--anos', default='2019-2024')
+    parser.add_argument('--meses', type=int, default=12)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--saida', help="Arquivo de saída (.arrow, .parquet ou .csv)")
+    parser.add_argument('--postgres', action='store_true',
+                        help=f"Carregar no Postgres configurado (host {DB_CONFIG['host']})")
+    args = parser.parse_args()
+
+    tabela = generate_table(args.municipios, parse_anos(args.anos), args.meses, args.seed)
+    print(f"{tabela.num_rows} linhas × {tabela.num_columns} colunas geradas")
+    if args.saida:
+        write_table(tabela, args.saida)
+        print(f"Gravado em {args.saida}")
+    if args.postgres:
+        run_async(load_into_postgres(tabela))
+        run_async(close_pool())
+        print(f"Tabela {TABLE_NAME} carregada no Postgres")
@@ -1,122 +1,106 @@
 import streamlit as st
-import pandas as pd
-from data_processing import load_data
-
-# ---------------------------------------------
-# Função para carregar os dados e padronizar colunas
-# ---------------------------------------------
-@st.cache_data
-def load_and_prepare_data():
-    # Carregar os dados
-    df = load_data()
-
-    # Garantir que a coluna 'ano_aih' seja numérica e válida
-    df['ano_aih'] = pd.to_numeric(df['ano_aih'], errors='coerce')
-    df = df[df['ano_aih'].notna()]  # Remove valores NaN
-    df['ano_aih'] = df['ano_aih'].astype(int)  # Converte para inteiro
-
-    # Remover colunas duplicadas
-    df = df.loc[:, ~df.columns.duplicated()]
-
-    # Renomear colunas para evitar confusão
-    df.columns = (
-        df.columns.str.strip()  # Remover espaços no início e fim
-        .str.replace(" ", "_")  # Substituir espaços por _
-        .str.replace("/", "_")  # Substituir barras por _
-        .str.replace("-", "_")  # Substituir traços por _
-        .str.lower()  # Transformar tudo para minúsculas
+from data_processing import rename_mapping
+from prepared_data import get_view, opcoes_estados, opcoes_municipios, opcoes_anos
+from paginated_table import paginated_dataframe
+from data_export import EXPORT_FORMATS, start_export, discard_export, export_bytes
+from summary_sketches import describe_view
+
+# Colunas irrelevantes para a visualização (personalize conforme necessário)
+colunas_irrelevantes = [
+    rename_mapping['qtd_0101'],
+]
+
+# Função principal da página, chamada pelo registro de páginas do home.py
+def render():
+    # ---------------------------------------------
+    # Configuração da Página
+    # ---------------------------------------------
+    st.title("Visualização de Dados - Internações Hospitalares")
+    st.markdown("""
+    Explore e filtre os dados sobre internações hospitalares.  
+    Exporte os dados filtrados para análise externa e visualize gráficos interativos.
+    """)
+
+    # ---------------------------------------------
+    # Filtros Interativos
+    # ---------------------------------------------
+    st.sidebar.header("Filtros de Dados")
+
+    # Dropdown para Estados com seleção múltipla e opção "Todos"
+    estados_disponiveis = ['Todos'] + opcoes_estados()
+    estado_selecionado = st.sidebar.selectbox(
+        "Escolha o estado:",
+        options=estados_disponiveis
     )
 
-    # Verificar e remover colunas irrelevantes (personalize conforme necessário)
-    colunas_irrelevantes = [
-        "quantidade_de_ações_coletivas_individuais_em_saúde",
-        "outros_dados_irrelevantes",  # Adicione mais colunas se necessário
-    ]
-    df = df.drop(columns=[col for col in colunas_irrelevantes if col in df.columns], errors="ignore")
-
-    return df
-
-# ---------------------------------------------
-# Configuração da Página
-# ---------------------------------------------
-st.title("Visualização de Dados - Internações Hospitalares")
-st.markdown("""
-Explore e filtre os dados sobre internações hospitalares.  
-Exporte os dados filtrados para análise externa e visualize gráficos interativos.
-""")
-
-# Carregar os dados
-df = load_and_prepare_data()
-
-# ---------------------------------------------
-# Filtros Interativos
-# ---------------------------------------------
-st.sidebar.header("Filtros de Dados")
-
-# Dropdown para Estados com seleção múltipla e opção "Todos"
-estados_disponiveis = ['Todos'] + sorted(df['uf_nome'].dropna().unique().tolist())
-estado_selecionado = st.sidebar.selectbox(
-    "Escolha o estado:",
-    options=estados_disponiveis
-)
-
-# Filtrar Estados
-if estado_selecionado != 'Todos':
-    df = df[df['uf_nome'] == estado_selecionado]
-
-# Dropdown para Municípios com seleção múltipla e opção "Todos"
-municipios_disponiveis = ['Todos'] + sorted(df[df['uf_nome'] == estado_selecionado]['nome_municipio'].dropna().unique().tolist())
-municipio_selecionado = st.sidebar.selectbox(
-    "Escolha o município:",
-    options=municipios_disponiveis
-)
-
-# Filtro por ano
-anos_disponiveis = ['Todos'] + sorted(df['ano_aih'].dropna().unique().astype(str).tolist())
-ano_selecionado = st.sidebar.selectbox("Selecione o Ano:", anos_disponiveis)
-
-# Aplicar filtros
-df_filtrado = df.copy()
-# Filtrar por estado
-if estado_selecionado != 'Todos':
-    df_filtrado = df_filtrado[df_filtrado['uf_nome'] == estado_selecionado]  # Usar igualdade simples para 'selectbox'
-# Filtrar por município
-if municipio_selecionado != 'Todos':
-    df_filtrado = df_filtrado[df_filtrado['nome_municipio'] == municipio_selecionado]  # Usar igualdade simples
-if ano_selecionado != "Todos":
-    df_filtrado = df_filtrado[df_filtrado['ano_aih'] == int(ano_selecionado)]
-if df_filtrado.empty:
-    st.warning("Nenhum dado encontrado com os filtros aplicados. Ajuste os filtros e tente novamente.")
-    st.stop()
-
-# ---------------------------------------------
-# Exibição dos Dados
-# ---------------------------------------------
-st.subheader("Dados Filtrados")
-st.write(f"Total de registros filtrados: {len(df_filtrado)}")
-st.dataframe(df_filtrado)
-
-# ---------------------------------------------
-# Exportação dos Dados
-# ---------------------------------------------
-st.subheader("Exportar Dados")
-st.markdown("Você pode exportar os dados filtrados para análise externa.")
-
-# Botão para baixar os dados filtrados
-@st.cache_data
-def convert_df_to_csv(dataframe):
-    return dataframe.to_csv(index=False).encode('utf-8')
-
-csv = convert_df_to_csv(df_filtrado)
-st.download_button(
-    label="Baixar CSV",
-    data=csv,
-    file_name="dados_filtrados.csv",
-    mime="text/csv"
-)
+    # Dropdown para Municípios com seleção múltipla e opção "Todos"
+    municipios_disponiveis = ['Todos'] + (opcoes_municipios(estado_selecionado) if estado_selecionado != 'Todos' else [])
+    municipio_selecionado = st.sidebar.selectbox(
+        "Escolha o município:",
+        options=municipios_disponiveis
+    )
 
-# ---------------------------------------------
-# Resumo Estatístico
-# ---------------------------------------------
-st.subheader("Resumo Estatístico dos Dados Filtrados")
-st.write(df_filtrado.describe())
+    # Filtro por ano
+    anos_disponiveis = ['Todos'] + [str(ano) for ano in opcoes_anos(estado_selecionado)]
+    ano_selecionado = st.sidebar.selectbox("Selecione o Ano:", anos_disponiveis)
+
+    # Aplicar filtros
+    df_filtrado = get_view(uf=estado_selecionado, municipio=municipio_selecionado, anos=ano_selecionado)
+    df_filtrado = df_filtrado.drop(columns=colunas_irrelevantes, errors="ignore")
+    if df_filtrado.empty:
+        st.warning("Nenhum dado encontrado com os filtros aplicados. Ajuste os filtros e tente novamente.")
+        st.stop()
+
+    # ---------------------------------------------
+    # Exibição dos Dados
+    # ---------------------------------------------
+    st.subheader("Dados Filtrados")
+    st.write(f"Total de registros filtrados: {len(df_filtrado)}")
+    paginated_dataframe(df_filtrado, key="visualizacao")
+
+    # ---------------------------------------------
+    # Exportação dos Dados
+    # ---------------------------------------------
+    st.subheader("Exportar Dados")
+    st.markdown("Você pode exportar os dados filtrados para análise externa.")
+
+    # Gerar o arquivo em blocos (em segundo plano para seleções grandes)
+    formato = st.selectbox("Formato:", list(EXPORT_FORMATS))
+    if st.button("Gerar arquivo"):
+        discard_export(st.session_state.get("exportacao"))
+        st.session_state["exportacao"] = start_export(df_filtrado, formato)
+        st.session_state["exportacao_formato"] = formato
+
+    # Botão para baixar os dados filtrados quando o arquivo estiver pronto
+    exportacao = st.session_state.get("exportacao")
+    if exportacao is not None:
+        formato_gerado = st.session_state["exportacao_formato"]
+        extensao, mime = EXPORT_FORMATS[formato_gerado]
+        if not exportacao.done():
+            st.info("Exportação em andamento...")
+            st.button("Atualizar status")
+        elif exportacao.exception() is not None:
+            st.error(f"Erro ao exportar os dados: {exportacao.exception()}")
+        else:
+            # Conteúdo lido do arquivo uma única vez e reaproveitado nas reexecuções
+            st.download_button(
+                label=f"Baixar {formato_gerado}",
+                data=export_bytes(exportacao),
+                file_name=f"dados_filtrados.{extensao}",
+                mime=mime
+            )
+
+    # ---------------------------------------------
+    # Resumo Estatístico
+    # ---------------------------------------------
+    st.subheader("Resumo Estatístico dos Dados Filtrados")
+    # Combina os resumos pré-calculados por (estado, município, ano), sem
+    # percorrer as linhas filtradas
+    colunas_numericas = df_filtrado.select_dtypes(include='number').columns
+    st.write(describe_view(
+        uf=estado_selecionado, municipio=municipio_selecionado, anos=ano_selecionado,
+        columns=colunas_numericas
+    ))
+
+if __name__ == "__main__":
+    render()